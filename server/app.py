@@ -1,22 +1,48 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import joblib
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 import numpy as np
 import pandas as pd
+from sklearn.preprocessing import StandardScaler
+import hmac
 import os
+import sys
 import traceback
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "../artifacts/xgb_model.joblib")
-SCALER_PATH = os.path.join(BASE_DIR, "../data/processed/scaler.pkl")
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
 
-try:
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-except Exception as e:
-    print(f" Error loading model/scaler: {e}")
-    model, scaler = None, None
+from src.inference.model_store import ModelStore
+from src.inference.explain import explain_rows, ResultCache
+from src.inference import wire
+from src.inference.tracing import Tracer, TracingMiddleware
+from src.data.drift import DriftMonitor, load_profile
+
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(BASE_DIR, "../artifacts/xgb_model.joblib"))
+SCALER_PATH = os.getenv("SCALER_PATH", os.path.join(BASE_DIR, "../data/processed/scaler.pkl"))
+FEATURE_PATH = os.getenv("FEATURE_PATH", os.path.join(BASE_DIR, "../data/processed/feature_cols.json"))
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))  # seconds, 0 = disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # admin endpoints are disabled unless this is set
+MODEL_THREADS = int(os.getenv("MODEL_THREADS", "0")) or None  # threads per model call, unset = library default
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "0"))  # sync endpoint threads per worker, 0 = anyio default (40)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", str(wire.MAX_ROWS)))  # per /score, /predict/batch, /explain/batch call
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "0") == "1"  # per-stage spans on every request
+TRACE_SAMPLE_EVERY = int(os.getenv("TRACE_SAMPLE_EVERY", "0"))  # profile 1 in N requests, 0 = off
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(BASE_DIR, "results", "profiles"))
+# /admin/reload only loads artifacts from these directories (joblib.load unpickles, so never arbitrary paths)
+RELOAD_DIRS = [
+    os.path.realpath(d) for d in os.getenv("RELOAD_DIRS", os.pathsep.join([
+        os.path.dirname(MODEL_PATH), os.path.dirname(SCALER_PATH), os.path.dirname(FEATURE_PATH),
+        os.path.join(BASE_DIR, "artifacts"),
+    ])).split(os.pathsep) if d
+]
+DRIFT_PROFILE_PATH = os.getenv("DRIFT_PROFILE_PATH", os.path.join(BASE_DIR, "data", "processed", "reference_profile.json"))
+DRIFT_WINDOW_BUCKETS = int(os.getenv("DRIFT_WINDOW_BUCKETS", "12"))
+DRIFT_BUCKET_ROWS = int(os.getenv("DRIFT_BUCKET_ROWS", "5000"))  # window ~ buckets x rows, most recent traffic
 
 # Expected feature order
 FEATURE_ORDER = [
@@ -26,8 +52,32 @@ FEATURE_ORDER = [
     "type_CASH_IN", "type_CASH_OUT", "type_DEBIT",
     "type_PAYMENT", "type_TRANSFER"
 ]
+TX_TYPES = wire.TX_TYPES
+# Filled from fixed balances / step by the API, so they drift by construction; kept out of the drift status
+DRIFT_EXCLUDED = [
+    "step", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest",
+    "isFlaggedFraud", "orig_balance_change", "dest_balance_change",
+]
+
+store = ModelStore(expected_columns=FEATURE_ORDER, n_jobs=MODEL_THREADS)
+try:
+    store.reload(MODEL_PATH, SCALER_PATH, FEATURE_PATH)
+except Exception as e:
+    print(f" Error loading model/scaler: {e}")
 
-NUMERIC_COLS = getattr(scaler, "feature_names_in_", [])
+# Per-transaction predictions and explanations, keyed by (model version, type, amount)
+result_cache = ResultCache(RESULT_CACHE_SIZE)
+tracer = Tracer(TRACE_DIR, enabled=TRACE_ENABLED, sample_every=TRACE_SAMPLE_EVERY)
+
+drift_monitor = None
+try:
+    drift_monitor = DriftMonitor(load_profile(DRIFT_PROFILE_PATH), DRIFT_WINDOW_BUCKETS, DRIFT_BUCKET_ROWS,
+                                 excluded=DRIFT_EXCLUDED)
+    if drift_monitor.columns != FEATURE_ORDER:
+        print(" Drift profile columns do not match API feature order; drift monitoring disabled")
+        drift_monitor = None
+except Exception as e:
+    print(f" Drift monitoring disabled: {e}")
 
 app = FastAPI(title="Fraud Detection API", version="1.0")
 
@@ -38,6 +88,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps everything, including CORS handling
+app.add_middleware(TracingMiddleware, tracer=tracer)
 
 
 class Transaction(BaseModel):
@@ -46,46 +98,149 @@ class Transaction(BaseModel):
     account_age: int
 
 
-def preprocess_input(tx: Transaction):
+class BatchPredictRequest(BaseModel):
+    transactions: List[Transaction]
+
+
+class BatchExplainRequest(BaseModel):
+    transactions: List[Transaction]
+    top_k: int = 5
+    flagged_only: bool = False
+
+
+class TracingConfig(BaseModel):
+    enabled: Optional[bool] = None
+    sample_every: Optional[int] = None
+    fmt: Optional[str] = None
+    max_files: Optional[int] = None
+    interval: Optional[float] = None
+    reset_stats: bool = False
+
+
+class ReloadRequest(BaseModel):
+    model_path: Optional[str] = None
+    scaler_path: Optional[str] = None
+    feature_path: Optional[str] = None
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    if THREADPOOL_SIZE > 0:
+        import anyio.to_thread
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+@app.on_event("startup")
+def start_model_watcher():
+    # Runs per worker, after any fork, so each process owns its watcher thread
+    if MODEL_WATCH_INTERVAL > 0:
+        store.start_watcher(MODEL_PATH, SCALER_PATH, FEATURE_PATH, interval=MODEL_WATCH_INTERVAL)
+
+
+@app.on_event("shutdown")
+def stop_model_watcher():
+    store.stop_watcher()
+
+
+def scale_numeric(scaler, X_num):
+    """StandardScaler.transform without the DataFrame round-trip; other scalers use transform()."""
+    if isinstance(scaler, StandardScaler):
+        if scaler.with_mean:
+            X_num = X_num - scaler.mean_
+        if scaler.with_std:
+            X_num = X_num / scaler.scale_
+        return X_num
+    if getattr(scaler, "feature_names_in_", None) is not None:
+        return scaler.transform(pd.DataFrame(X_num, columns=scaler.feature_names_in_))
+    return scaler.transform(X_num)
+
+
+def featurize(type_codes, amounts, bundle):
+    """
+    Type codes (index into TX_TYPES, -1 = unknown) and amounts straight to the
+    scaled model matrix with NumPy; every scoring route goes through here.
+    """
     BASE_ORG_BAL = 5000
     BASE_DEST_BAL = 1000
 
-    df = pd.DataFrame([{
-        "step": 1,
-        "amount": tx.amount,
-        "oldbalanceOrg": BASE_ORG_BAL,
-        "newbalanceOrig": max(0, BASE_ORG_BAL - tx.amount),
-        "oldbalanceDest": BASE_DEST_BAL,
-        "newbalanceDest": BASE_DEST_BAL + tx.amount,
-        "isFlaggedFraud": 0,
-    }])
-
-    # Feature Engineering
-    df["amount_log"] = np.log1p(df["amount"])
-    df["orig_balance_change"] = df["newbalanceOrig"] - df["oldbalanceOrg"]
-    df["dest_balance_change"] = df["newbalanceDest"] - df["oldbalanceDest"]
-
-    # One-hot Encoding
-    tx_type = tx.type.upper()
-    for t in ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"]:
-        df[f"type_{t}"] = 1 if tx_type == t else 0
+    with tracer.span("features"):
+        amounts = np.asarray(amounts, dtype=np.float64)
+        col = {c: i for i, c in enumerate(FEATURE_ORDER)}
+        X = np.zeros((len(amounts), len(FEATURE_ORDER)), dtype=np.float64)
+
+        new_orig = np.maximum(0, BASE_ORG_BAL - amounts)
+        new_dest = BASE_DEST_BAL + amounts
+        X[:, col["step"]] = 1
+        X[:, col["amount"]] = amounts
+        X[:, col["oldbalanceOrg"]] = BASE_ORG_BAL
+        X[:, col["newbalanceOrig"]] = new_orig
+        X[:, col["oldbalanceDest"]] = BASE_DEST_BAL
+        X[:, col["newbalanceDest"]] = new_dest
+        X[:, col["amount_log"]] = np.log1p(amounts)
+        X[:, col["orig_balance_change"]] = new_orig - BASE_ORG_BAL
+        X[:, col["dest_balance_change"]] = new_dest - BASE_DEST_BAL
+
+        # One-hot Encoding (unknown types stay all-zero)
+        type_codes = np.asarray(type_codes)
+        for code, t in enumerate(TX_TYPES):
+            X[:, col[f"type_{t}"]] = type_codes == code
 
     # Scale Numeric
-    scaled_numeric = pd.DataFrame(
-        scaler.transform(df[NUMERIC_COLS]),
-        columns=NUMERIC_COLS
-    )
+    with tracer.span("scale"):
+        idx = [col[c] for c in bundle.numeric_cols]
+        X[:, idx] = scale_numeric(bundle.scaler, X[:, idx])
+    return X
+
+
+def preprocess_batch(types, amounts, bundle):
+    """featurize for transaction type strings and amounts."""
+    codes = [wire.TYPE_CODES.get(str(t).upper(), -1) for t in types]
+    return featurize(codes, amounts, bundle)
+
+
+def observe_drift(X, bundle):
+    if drift_monitor is not None:
+        with tracer.span("drift"):
+            drift_monitor.update(X, bundle.version, bundle.scaler)
 
-    # Merge Scaled + Categorical
-    final_df = pd.concat([
-        scaled_numeric,
-        df[[c for c in df.columns if c not in NUMERIC_COLS]]
-    ], axis=1)
 
-    # Reorder Columns
-    final_df = final_df.reindex(columns=FEATURE_ORDER, fill_value=0)
+def score_matrix(X, bundle):
+    observe_drift(X, bundle)
+    with tracer.span("predict"):
+        probs = bundle.model.predict_proba(X)[:, 1]
+    return probs, (probs > 0.5).astype(np.uint8)
 
-    return final_df.values
+
+def explain_transactions(txs, bundle, top_k):
+    """Explanations for txs, computing only cache misses, all in one vectorized booster call."""
+    keys = [(bundle.version, tx.type.upper(), float(tx.amount)) for tx in txs]
+    explanations = [None] * len(txs)
+    misses = []
+    for i, key in enumerate(keys):
+        entry = result_cache.get(key)
+        if entry is not None and "explanation" in entry:
+            explanations[i] = entry["explanation"]
+        else:
+            misses.append(i)
+
+    if misses:
+        X = preprocess_batch([txs[i].type for i in misses], [txs[i].amount for i in misses], bundle)
+        with tracer.span("explain"):
+            fresh = explain_rows(bundle.model, bundle.scaler, X, FEATURE_ORDER, bundle.numeric_cols)
+        for j, (i, expl) in enumerate(zip(misses, fresh)):
+            explanations[i] = expl
+            result_cache.put(keys[i], {"probability": expl["probability"], "explanation": expl, "features": X[j:j + 1]})
+
+    results = []
+    for expl in explanations:
+        ranked = sorted(expl["contributions"], key=lambda c: abs(c["contribution"]), reverse=True)
+        results.append({
+            "probability": round(expl["probability"] * 100, 2),
+            "label": int(expl["probability"] > 0.5),
+            "base_value": expl["base_value"],
+            "contributions": ranked[:top_k] if top_k > 0 else ranked,
+        })
+    return results
 
 
 @app.get("/")
@@ -98,17 +253,32 @@ def home():
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    bundle = store.current
+    return {"status": "ok", "model_version": bundle.version if bundle else None}
 
 
 @app.post("/predict")
 def predict(tx: Transaction):
-    if model is None or scaler is None:
+    tracer.mark("parse")
+    # Take one reference for the whole request so a concurrent hot-swap can't mix artifacts
+    bundle = store.current
+    if bundle is None:
         return {"error": "Model or scaler not loaded on server. Please redeploy."}
 
     try:
-        X = preprocess_input(tx)
-        proba = float(model.predict_proba(X)[0][1])
+        key = (bundle.version, tx.type.upper(), float(tx.amount))
+        cached = result_cache.get(key)
+        if cached is not None:
+            proba = cached["probability"]
+            # Cache hits still count towards the incoming feature distribution
+            if "features" in cached:
+                observe_drift(cached["features"], bundle)
+        else:
+            X = preprocess_batch([tx.type], [tx.amount], bundle)
+            observe_drift(X, bundle)
+            with tracer.span("predict"):
+                proba = float(bundle.model.predict_proba(X)[0][1])
+            result_cache.put(key, {"probability": proba, "features": X})
         label = int(proba > 0.5)
 
         return {
@@ -119,6 +289,7 @@ def predict(tx: Transaction):
                 if label == 1
                 else "Safe transaction detected."
             ),
+            "model_version": bundle.version,
         }
 
     except Exception as e:
@@ -126,6 +297,201 @@ def predict(tx: Transaction):
         return {"error": str(e)}
 
 
+@app.post("/predict/batch")
+def predict_batch(req: BatchPredictRequest):
+    """JSON batch scoring: compact arrays, no per-row messages."""
+    tracer.mark("parse")
+    bundle = store.current
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Model or scaler not loaded on server. Please redeploy.")
+    txs = req.transactions
+    check_batch_size(len(txs))
+    X = preprocess_batch([tx.type for tx in txs], [tx.amount for tx in txs], bundle)
+    probs, labels = score_matrix(X, bundle)
+    return {
+        "model_version": bundle.version,
+        # float64 before rounding: float32 values serialise as e.g. 0.029999999329447746
+        "probabilities": np.round(probs.astype(np.float64) * 100, 2).tolist(),
+        "labels": labels.tolist(),
+    }
+
+
+@app.post("/score")
+async def score_binary(request: Request):
+    """
+    Binary scoring for high-volume clients (single row = batch of one).
+    Accepts raw little-endian float32 rows or columnar MessagePack; see src/inference/wire.py.
+    """
+    bundle = store.current
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Model or scaler not loaded on server. Please redeploy.")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    declared = request.headers.get("content-length")
+    if content_type == wire.RAW_CONTENT_TYPE and declared and declared.isdigit() \
+            and int(declared) > wire.max_body_bytes(MAX_BATCH_ROWS):
+        raise HTTPException(status_code=413, detail=f"Body too large: at most {MAX_BATCH_ROWS} rows per request")
+    body = await request.body()
+    tracer.mark("receive")
+    try:
+        with tracer.span("decode"):
+            if content_type == wire.RAW_CONTENT_TYPE:
+                type_codes, amounts = wire.decode_rows(body, MAX_BATCH_ROWS)
+            elif content_type in wire.MSGPACK_CONTENT_TYPES:
+                if wire.msgpack is None:
+                    raise HTTPException(status_code=415, detail="MessagePack support is not installed on this server")
+                type_codes, amounts = wire.decode_msgpack(body, MAX_BATCH_ROWS)
+            else:
+                raise HTTPException(status_code=415, detail=f"Unsupported content type {content_type!r}")
+    except wire.BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # Model work is CPU-bound: keep it off the event loop
+    probs, labels = await run_in_threadpool(lambda: score_matrix(featurize(type_codes, amounts, bundle), bundle))
+
+    headers = {"X-Model-Version": bundle.version}
+    with tracer.span("encode"):
+        if content_type == wire.RAW_CONTENT_TYPE:
+            payload, media_type = wire.encode_scores(probs, labels), wire.RAW_CONTENT_TYPE
+        else:
+            payload, media_type = wire.encode_msgpack_scores(probs, labels, bundle.version), wire.MSGPACK_CONTENT_TYPES[0]
+    return Response(payload, media_type=media_type, headers=headers)
+
+
+@app.post("/explain")
+def explain(tx: Transaction, top_k: int = 5):
+    """Per-feature contributions (log-odds) for one transaction, largest first."""
+    tracer.mark("parse")
+    bundle = store.current
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Model or scaler not loaded on server. Please redeploy.")
+    try:
+        result = explain_transactions([tx], bundle, top_k)[0]
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "model_version": bundle.version}
+
+
+@app.post("/explain/batch")
+def explain_batch(req: BatchExplainRequest):
+    """Explain many transactions in one vectorized call; flagged_only keeps just the predicted frauds."""
+    tracer.mark("parse")
+    bundle = store.current
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="Model or scaler not loaded on server. Please redeploy.")
+    check_batch_size(len(req.transactions))
+    try:
+        results = explain_transactions(req.transactions, bundle, req.top_k)
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    items = [{"index": i, **r} for i, r in enumerate(results) if r["label"] == 1 or not req.flagged_only]
+    return {"model_version": bundle.version, "results": items}
+
+
+def check_batch_size(n_rows):
+    if n_rows > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch of {n_rows} rows exceeds the limit of {MAX_BATCH_ROWS}")
+
+
+def check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: set ADMIN_TOKEN on the server")
+    if token is None or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def resolve_reload_path(path, default):
+    """Requested artifact path (relative paths resolve against the project root), confined to RELOAD_DIRS."""
+    if not path:
+        return default
+    full = os.path.realpath(os.path.join(BASE_DIR, path))
+    if not any(os.path.commonpath([full, root]) == root for root in RELOAD_DIRS):
+        raise HTTPException(status_code=403, detail=f"{path!r} is outside the allowed artifact directories")
+    return full
+
+
+@app.get("/admin/model")
+def model_info(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    bundle = store.current
+    return {
+        "model_version": bundle.version if bundle else None,
+        "paths": bundle.paths if bundle else None,
+        "loaded_at": bundle.loaded_at if bundle else None,
+        "last_error": store.last_error,
+    }
+
+
+@app.get("/drift")
+def drift(min_rows: int = 500):
+    """Per-feature PSI / KS of recent traffic against the training reference profile (this worker only)."""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="No drift reference profile loaded")
+    return drift_monitor.scores(min_rows=min_rows)
+
+
+@app.post("/admin/drift/reset")
+def reset_drift(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="No drift reference profile loaded")
+    drift_monitor.reset()
+    return {"status": "reset"}
+
+
+@app.get("/admin/tracing")
+def tracing_status(x_admin_token: Optional[str] = Header(None)):
+    check_admin(x_admin_token)
+    return {
+        "enabled": tracer.enabled,
+        "sample_every": tracer.sample_every,
+        "fmt": tracer.fmt,
+        "max_files": tracer.max_files,
+        "interval": tracer.interval,
+        "out_dir": tracer.out_dir,
+        "stages": tracer.stats.summary(),
+    }
+
+
+@app.post("/admin/tracing")
+def configure_tracing(cfg: TracingConfig, x_admin_token: Optional[str] = Header(None)):
+    """Toggle spans / sampled profiling at runtime (per worker process)."""
+    check_admin(x_admin_token)
+    if cfg.fmt is not None and cfg.fmt not in ("collapsed", "speedscope"):
+        raise HTTPException(status_code=422, detail="fmt must be 'collapsed' or 'speedscope'")
+    if cfg.sample_every is not None and cfg.sample_every < 0:
+        raise HTTPException(status_code=422, detail="sample_every must be >= 0")
+    if cfg.interval is not None and cfg.interval <= 0:
+        raise HTTPException(status_code=422, detail="interval must be > 0")
+    if cfg.max_files is not None and cfg.max_files < 1:
+        raise HTTPException(status_code=422, detail="max_files must be >= 1")
+    tracer.configure(enabled=cfg.enabled, sample_every=cfg.sample_every, fmt=cfg.fmt,
+                     max_files=cfg.max_files, interval=cfg.interval)
+    if cfg.reset_stats:
+        tracer.stats.reset()
+    return tracing_status(x_admin_token)
+
+
+@app.post("/admin/reload")
+def reload_model(req: ReloadRequest = ReloadRequest(), x_admin_token: Optional[str] = Header(None)):
+    """Load, validate and warm a new artifact set in the threadpool, then swap it in."""
+    check_admin(x_admin_token)
+    previous = store.current
+    model_path = resolve_reload_path(req.model_path, MODEL_PATH)
+    scaler_path = resolve_reload_path(req.scaler_path, SCALER_PATH)
+    feature_path = resolve_reload_path(req.feature_path, FEATURE_PATH)
+    try:
+        bundle = store.reload(model_path, scaler_path, feature_path)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"New artifacts rejected: {e}")
+    return {
+        "previous_version": previous.version if previous else None,
+        "model_version": bundle.version,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=10000, reload=True)
\ No newline at end of file
@@ -0,0 +1,280 @@
+# loadtest.py -- open-loop HTTP load generator for the scoring API
+#
+#   python loadtest.py --rates 50,100,200 --duration 30
+#   python loadtest.py --url http://my-host:10000 --rates 500 --mix predict=0.7,score=0.3
+#
+# Without --url it starts a local instance (serve.py) on a free port. Requests are
+# replayed from data/processed/val.csv, inverse-transformed with the scaler so
+# amounts are realistic. Arrivals follow a Poisson schedule that does not wait
+# for responses (open loop); latency is measured from the *scheduled* send time,
+# so a saturated server shows up as queueing delay instead of a lower send rate.
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SERVER_DIR)
+sys.path.insert(0, BASE_DIR)
+
+from src.inference import wire
+
+ENDPOINTS = ("predict", "predict_batch", "score", "explain")
+
+
+def load_transactions(val_path, scaler_path, n_max=None):
+    """Raw (type, amount) pairs recovered from the scaled validation split."""
+    import joblib
+
+    df = pd.read_csv(val_path)
+    scaler = joblib.load(scaler_path)
+    cols = list(getattr(scaler, "feature_names_in_", []))
+    raw = scaler.inverse_transform(df[cols].to_numpy(dtype=np.float64))
+    amounts = np.clip(raw[:, cols.index("amount")], 0, None)
+
+    type_cols = [f"type_{t}" for t in wire.TX_TYPES]
+    onehot = df.reindex(columns=type_cols, fill_value=0).to_numpy(dtype=np.float64)
+    codes = onehot.argmax(axis=1)
+    if n_max:
+        codes, amounts = codes[:n_max], amounts[:n_max]
+    return codes, amounts
+
+
+def build_request(endpoint, codes, amounts, rng, batch_size):
+    """(path, kwargs for httpx) for one request drawn from the transaction pool."""
+    if endpoint in ("predict", "explain"):
+        i = rng.integers(len(codes))
+        body = {"type": wire.TX_TYPES[codes[i]], "amount": float(amounts[i]),
+                "account_age": int(rng.integers(0, 3650))}
+        return f"/{endpoint}", {"json": body}
+    idx = rng.integers(len(codes), size=batch_size)
+    if endpoint == "predict_batch":
+        txs = [{"type": wire.TX_TYPES[codes[i]], "amount": float(amounts[i]), "account_age": 0} for i in idx]
+        return "/predict/batch", {"json": {"transactions": txs}}
+    return "/score", {"content": wire.encode_rows(codes[idx], amounts[idx]),
+                      "headers": {"content-type": wire.RAW_CONTENT_TYPE}}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, weight = part.split("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {ENDPOINTS}")
+        mix[name] = float(weight)
+    total = sum(mix.values())
+    return {k: v / total for k, v in mix.items()}
+
+
+async def run_rate(base_url, rate, duration, mix, codes, amounts, connections, batch_size, timeout, seed):
+    import httpx
+
+    rng = np.random.default_rng(seed)
+    n = int(rate * duration)
+    offsets = np.cumsum(rng.exponential(1.0 / rate, size=n))
+    endpoints = rng.choice(list(mix), size=n, p=list(mix.values()))
+    requests = [build_request(e, codes, amounts, rng, batch_size) for e in endpoints]  # pre-built off the clock
+
+    results = []
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def fire(endpoint, scheduled, path, kwargs):
+            sent = time.perf_counter()
+            status = None
+            try:
+                resp = await client.post(path, **kwargs)
+                status = resp.status_code
+                # /predict reports scoring failures as 200 {"error": ...}; those are not successes
+                if status == 200 and resp.headers.get("content-type", "").startswith("application/json"):
+                    body = resp.json()
+                    if isinstance(body, dict) and "error" in body:
+                        status = "error_body"
+            except Exception as e:
+                status = type(e).__name__
+            done = time.perf_counter()
+            results.append((endpoint, status, done - scheduled, done - sent, sent - scheduled))
+
+        start = time.perf_counter() + 0.05
+        tasks = []
+        for off, endpoint, (path, kwargs) in zip(offsets, endpoints, requests):
+            scheduled = start + off
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(endpoint, scheduled, path, kwargs)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return summarize(results, rate, elapsed, batch_size)
+
+
+def _percentiles(values):
+    if len(values) == 0:
+        return {}
+    ms = np.asarray(values) * 1000
+    return {f"p{q:g}": float(np.percentile(ms, q)) for q in (50, 90, 95, 99, 99.9)} | {"max": float(ms.max())}
+
+
+def summarize(results, rate, elapsed, batch_size):
+    report = {"target_rate": rate, "elapsed_s": elapsed, "endpoints": {}}
+    for endpoint in sorted({r[0] for r in results}):
+        rows = [r for r in results if r[0] == endpoint]
+        ok = [r for r in rows if r[1] == 200]
+        errors = {}
+        for r in rows:
+            if r[1] != 200:
+                errors[str(r[1])] = errors.get(str(r[1]), 0) + 1
+        rows_per_req = batch_size if endpoint in ("predict_batch", "score") else 1
+        report["endpoints"][endpoint] = {
+            "requests": len(rows),
+            "ok": len(ok),
+            "error_rate": 1 - len(ok) / len(rows),
+            "errors": errors,
+            "throughput_rps": len(ok) / elapsed,
+            "transactions_per_s": len(ok) * rows_per_req / elapsed,
+            "latency_ms": _percentiles([r[2] for r in ok]),          # from scheduled time (includes queueing)
+            "service_latency_ms": _percentiles([r[3] for r in ok]),  # from actual send
+        }
+    lag = [r[4] for r in results]
+    # If the client itself can't keep up, dispatch lag grows and the run under-reports capacity
+    report["client_dispatch_lag_ms"] = _percentiles(lag)
+    all_ok = [r[2] for r in results if r[1] == 200]
+    report["overall"] = {
+        "requests": len(results),
+        "throughput_rps": len(all_ok) / elapsed,
+        "error_rate": 1 - len(all_ok) / max(len(results), 1),
+        "latency_ms": _percentiles(all_ok),
+    }
+    return report
+
+
+def print_report(report):
+    print(f"\n Target {report['target_rate']:.0f} req/s over {report['elapsed_s']:.1f}s")
+    print(f"  {'endpoint':<14}{'req':>8}{'ok/s':>10}{'err':>8}{'p50':>9}{'p99':>9}{'p99.9':>9}{'max':>9}")
+    for name, e in report["endpoints"].items():
+        lat = e["latency_ms"] or {"p50": float("nan"), "p99": float("nan"), "p99.9": float("nan"), "max": float("nan")}
+        print(f"  {name:<14}{e['requests']:>8}{e['throughput_rps']:>10.1f}{e['error_rate']:>8.2%}"
+              f"{lat['p50']:>9.1f}{lat['p99']:>9.1f}{lat['p99.9']:>9.1f}{lat['max']:>9.1f}")
+    lag = report["client_dispatch_lag_ms"]
+    if lag and lag["p99"] > 5:
+        print(f"  ! client dispatch lag p99 {lag['p99']:.1f} ms: the load generator is saturated")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(port, workers, extra_env):
+    env = {**os.environ, **extra_env}
+    proc = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env,
+    )
+    import httpx
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Local server exited with code {proc.returncode}")
+        try:
+            if model_loaded(f"http://127.0.0.1:{port}"):
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("Local server did not report a loaded model (model_version) within 60s")
+
+
+def model_loaded(base_url):
+    """Healthy *and* serving a model: /health answers 200 even when artifacts failed to load."""
+    import httpx
+    resp = httpx.get(f"{base_url}/health", timeout=1)
+    return resp.status_code == 200 and resp.json().get("model_version") is not None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="target an existing deployment instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="workers for the local stand-in server")
+    parser.add_argument("--rates", default="50,100,200", help="comma-separated target request rates to step through")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per rate step")
+    parser.add_argument("--mix", default="predict=0.85,predict_batch=0.05,score=0.05,explain=0.05")
+    parser.add_argument("--batch_size", type=int, default=100, help="rows per batch request")
+    parser.add_argument("--connections", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--slo_p99_ms", type=float, default=50.0)
+    parser.add_argument("--val_path", default=os.path.join(BASE_DIR, "data/processed/val.csv"))
+    parser.add_argument("--model_path", default=os.getenv("MODEL_PATH", os.path.join(BASE_DIR, "artifacts/xgb_model.joblib")),
+                        help="model for the local stand-in server")
+    parser.add_argument("--scaler_path", default=os.getenv("SCALER_PATH", os.path.join(BASE_DIR, "data/processed/scaler.pkl")))
+    parser.add_argument("--feature_path",
+                        default=os.getenv("FEATURE_PATH", os.path.join(BASE_DIR, "data/processed/feature_cols.json")))
+    parser.add_argument("--out_dir", default=os.path.join(BASE_DIR, "results/loadtest"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    codes, amounts = load_transactions(args.val_path, args.scaler_path)
+    print(f" Loaded {len(codes)} transactions for replay; mix {mix}")
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        # Serve with the same artifacts the replayed transactions were unscaled with
+        proc = start_local_server(port, args.workers, {
+            "MODEL_PATH": os.path.abspath(args.model_path),
+            "SCALER_PATH": os.path.abspath(args.scaler_path),
+            "FEATURE_PATH": os.path.abspath(args.feature_path),
+        })
+        base_url = f"http://127.0.0.1:{port}"
+        print(f" Local server up at {base_url} ({args.workers} worker(s))")
+    elif not model_loaded(base_url):
+        raise SystemExit(f" {base_url} has no model loaded (model_version is null); refusing to load-test it")
+
+    steps = []
+    try:
+        for i, rate in enumerate(float(r) for r in args.rates.split(",")):
+            report = asyncio.run(run_rate(base_url, rate, args.duration, mix, codes, amounts,
+                                          args.connections, args.batch_size, args.timeout, args.seed + i))
+            print_report(report)
+            steps.append(report)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    passing = [s["target_rate"] for s in steps
+               if s["overall"]["latency_ms"] and s["overall"]["latency_ms"]["p99"] < args.slo_p99_ms
+               and s["overall"]["error_rate"] == 0]
+    summary = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "target": base_url if args.url else "local",
+        "workers": args.workers if args.url is None else None,
+        "mix": mix,
+        "batch_size": args.batch_size,
+        "slo_p99_ms": args.slo_p99_ms,
+        "max_rate_meeting_slo": max(passing) if passing else None,
+        "steps": steps,
+    }
+    os.makedirs(args.out_dir, exist_ok=True)
+    out_path = os.path.join(args.out_dir, f"loadtest_{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n Highest rate meeting p99 < {args.slo_p99_ms:.0f} ms with no errors: {summary['max_rate_meeting_slo']}")
+    print(f" Report saved → {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# serve.py -- production launcher: load artifacts once, then fork workers that share them copy-on-write
+#
+#   python serve.py --workers 4 --threads 16 --model-threads 1
+#
+# Each worker runs its own uvicorn event loop on a socket bound by the parent.
+# Because the model and scaler are loaded before fork(), their pages are shared
+# between workers until written, so memory does not grow N x with worker count.
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "10000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("THREADPOOL_SIZE", "0")),
+                        help="threadpool size for sync endpoints in each worker (0 = anyio default)")
+    parser.add_argument("--model-threads", type=int, default=int(os.getenv("MODEL_THREADS", "1")),
+                        help="threads each model call may use inside a worker")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args()
+
+
+def bind_socket(host, port, backlog):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level):
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def main():
+    args = parse_args()
+
+    # Must be set before numpy / xgboost / torch are imported so their pools respect it
+    os.environ["MODEL_THREADS"] = str(args.model_threads)
+    os.environ["THREADPOOL_SIZE"] = str(args.threads)
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(args.model_threads))
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module  # loads model + scaler once, in the parent
+
+    # Move everything allocated so far out of the collector's reach so that
+    # gc passes in the workers don't write to (and un-share) the parent's pages
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    print(f" Parent {os.getpid()} loaded model {getattr(app_module.store.current, 'version', None)}; "
+          f"forking {args.workers} workers on {args.host}:{args.port}")
+
+    children = {}
+    shutting_down = False
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                run_worker(app_module.app, sock, args.log_level)
+            finally:
+                os._exit(0)
+        children[pid] = slot
+
+    def shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for slot in range(args.workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not shutting_down:
+            print(f" Worker {pid} exited with status {status}; restarting")
+            time.sleep(1)
+            spawn(slot)
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+_EPS = 1e-6
+
+
+def _bin_edges(x, n_bins):
+    """Quantile edges for continuous features; midpoints between values for low-cardinality ones (one-hot, flags)."""
+    values = np.unique(x)
+    if len(values) <= n_bins:
+        return (values[:-1] + values[1:]) / 2
+    return np.unique(np.quantile(x, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+
+def build_reference_profile(X, columns, n_bins=20, scaler=None, numeric_cols=None):
+    """
+    Per-feature histogram of the (scaled) training matrix. Bins are open-ended
+    at both sides, so bin i covers [edges[i-1], edges[i]) and every value lands
+    somewhere. The scaler statistics are stored so the edges can be rebased if
+    a later model ships with a refitted scaler.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    features = {}
+    for j, col in enumerate(columns):
+        x = X[:, j][np.isfinite(X[:, j])]
+        edges = _bin_edges(x, n_bins)
+        counts = np.bincount(np.searchsorted(edges, x, side="right"), minlength=len(edges) + 1)
+        features[col] = {"edges": edges.tolist(), "counts": counts.tolist()}
+
+    profile = {"columns": list(columns), "n_rows": int(len(X)), "n_bins": n_bins, "features": features}
+    if scaler is not None and getattr(scaler, "mean_", None) is not None:
+        profile["scaler"] = {
+            "numeric_cols": list(numeric_cols),
+            "mean": np.asarray(scaler.mean_).tolist(),
+            "scale": np.asarray(scaler.scale_).tolist(),
+        }
+    return profile
+
+
+def save_profile(profile, path):
+    with open(path, "w") as f:
+        json.dump(profile, f)
+
+
+def load_profile(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class DriftMonitor:
+    """
+    Streaming drift scores for the model's input matrix.
+
+    Keeps a ring of `n_buckets` histograms of `bucket_rows` rows each, so scores
+    cover roughly the most recent n_buckets * bucket_rows rows in fixed memory
+    (n_buckets x n_features x n_bins counters). update() bins a whole batch
+    with one broadcast comparison and one bincount. State is per process.
+    Columns in `excluded` are still scored but reported separately and left
+    out of max_psi / status (e.g. inputs the caller fills with constants).
+    """
+
+    def __init__(self, profile, n_buckets=12, bucket_rows=5000, excluded=()):
+        self.columns = profile["columns"]
+        self.excluded = set(excluded)
+        self.n_buckets = n_buckets
+        self.bucket_rows = bucket_rows
+        self.profile = profile
+
+        n_features = len(self.columns)
+        self.n_slots = max(len(profile["features"][c]["counts"]) for c in self.columns)
+        self._ref_edges = np.full((n_features, self.n_slots - 1), np.inf)
+        self.ref_counts = np.zeros((n_features, self.n_slots))
+        for j, col in enumerate(self.columns):
+            feat = profile["features"][col]
+            self._ref_edges[j, :len(feat["edges"])] = feat["edges"]
+            self.ref_counts[j, :len(feat["counts"])] = feat["counts"]
+        self.ref_props = self.ref_counts / np.maximum(self.ref_counts.sum(axis=1, keepdims=True), 1)
+
+        ref_scaler = profile.get("scaler")
+        self._scaled_idx = [self.columns.index(c) for c in ref_scaler["numeric_cols"]] if ref_scaler else []
+        self._ref_stats = (np.asarray(ref_scaler["mean"]), np.asarray(ref_scaler["scale"])) if ref_scaler else None
+        self._bound_stats = self._ref_stats
+        self.edges = self._ref_edges.copy()
+        self.version = None
+
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.buckets = np.zeros((self.n_buckets, len(self.columns), self.n_slots), dtype=np.int64)
+        self.bucket_fill = np.zeros(self.n_buckets, dtype=np.int64)
+        self.current = 0
+        self.rows_seen = 0
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def _bind(self, version, scaler):
+        """
+        Follow the live model: if its scaler differs from the one the edges are
+        expressed in, map the reference edges raw -> new scaled space and start
+        a fresh window (old counts are in the old space). Caller holds the lock.
+        """
+        self.version = version
+        if self._ref_stats is None or getattr(scaler, "mean_", None) is None:
+            return
+        stats = (np.asarray(scaler.mean_), np.asarray(scaler.scale_))
+        if all(np.allclose(a, b) for a, b in zip(stats, self._bound_stats)):
+            return
+        ref_mean, ref_scale = self._ref_stats
+        idx = self._scaled_idx
+        raw = self._ref_edges[idx] * ref_scale[:, None] + ref_mean[:, None]
+        edges = self._ref_edges.copy()
+        edges[idx] = (raw - stats[0][:, None]) / stats[1][:, None]
+        self.edges = edges
+        self._bound_stats = stats
+        self._clear()
+
+    def update(self, X, version=None, scaler=None):
+        """Add a batch of model inputs (rows in `columns` order)."""
+        if version is not None and version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._bind(version, scaler)
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.columns))
+        if len(X) == 0:
+            return
+        # Bin index = number of edges <= value (padding edges are +inf); NaN lands in bin 0
+        bins = (X[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        flat = bins + np.arange(len(self.columns)) * self.n_slots
+        counts = np.bincount(flat.ravel(), minlength=len(self.columns) * self.n_slots)
+        counts = counts.reshape(len(self.columns), self.n_slots)
+
+        with self._lock:
+            if self.bucket_fill[self.current] >= self.bucket_rows:
+                self.current = (self.current + 1) % self.n_buckets
+                self.buckets[self.current] = 0
+                self.bucket_fill[self.current] = 0
+            self.buckets[self.current] += counts
+            self.bucket_fill[self.current] += len(X)
+            self.rows_seen += len(X)
+
+    def scores(self, min_rows=500):
+        """PSI and binned KS per feature over the current window, worst first."""
+        with self._lock:
+            counts = self.buckets.sum(axis=0).astype(np.float64)
+            window = int(self.bucket_fill.sum())
+            rows_seen = self.rows_seen
+
+        props = counts / max(window, 1)
+        # Padding slots are empty on both sides and contribute nothing
+        p = self.ref_props + _EPS
+        q = props + _EPS
+        psi = ((q - p) * np.log(q / p)).sum(axis=1)
+        ks = np.abs(np.cumsum(props, axis=1) - np.cumsum(self.ref_props, axis=1)).max(axis=1)
+
+        features, excluded = {}, {}
+        for j in np.argsort(-psi):
+            col = self.columns[j]
+            target = excluded if col in self.excluded else features
+            target[col] = {"psi": float(psi[j]), "ks": float(ks[j]), "status": _status(psi[j])}
+        enough = window >= min_rows
+        worst = max((f["psi"] for f in features.values()), default=0.0)
+        return {
+            "model_version": self.version,
+            "window_rows": window,
+            "rows_seen": rows_seen,
+            "max_psi": worst,
+            "status": _status(worst) if enough else "insufficient_data",
+            "features": features,
+            "excluded_features": excluded,
+        }
+
+
+def _status(psi):
+    if psi >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+if __name__ == "__main__":
+    # Rebuild the reference profile from an existing processed split without re-running preprocessing
+    import joblib
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data_dir", default="data/processed")
+    parser.add_argument("--n_bins", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(f"{args.data_dir}/feature_cols.json") as f:
+        meta = json.load(f)
+    df = pd.read_csv(f"{args.data_dir}/train.csv")
+    scaler = joblib.load(f"{args.data_dir}/scaler.pkl")
+    X = df[meta["all_columns"]].to_numpy(dtype=np.float64)
+    profile = build_reference_profile(X, meta["all_columns"], args.n_bins, scaler, meta["numeric_cols"])
+    save_profile(profile, f"{args.data_dir}/reference_profile.json")
+    print(f"Reference profile saved → {args.data_dir}/reference_profile.json ({len(X)} rows)")
@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from src.data.drift import build_reference_profile, save_profile
 
 def load_raw(path):
     return pd.read_csv(path)
@@ -47,6 +48,11 @@ def split_and_save(df, out_dir, test_size=0.2, val_size=0.1, random_state=42):
         Xt[num_cols] = scaler.transform(Xt[num_cols])
         out_df = pd.concat([Xt, yp], axis=1)
         out_df.to_csv(f"{out_dir}/{name}.csv", index=False)
+        if name == 'train':
+            # Training-time feature distributions for the server's drift monitor
+            profile = build_reference_profile(Xt.to_numpy(dtype=np.float64), list(Xt.columns),
+                                              scaler=scaler, numeric_cols=list(num_cols))
+            save_profile(profile, f"{out_dir}/reference_profile.json")
 
     joblib.dump(scaler, f"{out_dir}/scaler.pkl")
     with open(f"{out_dir}/feature_cols.json", "w") as f:
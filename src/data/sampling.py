@@ -0,0 +1,40 @@
+import numpy as np
+from imblearn.under_sampling import RandomUnderSampler
+
+
+def downsample_negatives(y, neg_rate, random_state=42):
+    """
+    Keep every positive and a random `neg_rate` fraction of negatives.
+
+    Returns (indices, weights): row indices into the original data and a
+    per-row importance weight (1 / realised keep rate for negatives, 1 for
+    positives), so weighted losses and sample_weight fits stay calibrated to
+    the original class prior.
+    """
+    y = np.asarray(y).ravel().astype(int)
+    n_neg = int(np.sum(y == 0))
+    n_pos = int(np.sum(y == 1))
+    n_keep = max(1, int(round(n_neg * neg_rate)))
+
+    sampler = RandomUnderSampler(sampling_strategy={0: n_keep, 1: n_pos}, random_state=random_state)
+    sampler.fit_resample(np.zeros((len(y), 1)), y)
+    indices = np.sort(sampler.sample_indices_)
+
+    weights = np.ones(len(indices), dtype=np.float32)
+    weights[y[indices] == 0] = n_neg / n_keep
+    return indices, weights
+
+
+class NegativeSampler:
+    """
+    Draws a fresh negative subsample every epoch so torch trainers see all
+    legitimate rows over time while each epoch only touches `neg_rate` of them.
+    """
+
+    def __init__(self, y, neg_rate, random_state=42):
+        self.y = np.asarray(y).ravel().astype(int)
+        self.neg_rate = neg_rate
+        self.random_state = random_state
+
+    def epoch(self, epoch):
+        return downsample_negatives(self.y, self.neg_rate, random_state=self.random_state + epoch)
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def tree_contributions(model, X):
+    """
+    Exact per-feature contributions (TreeSHAP, in log-odds) for every row of X
+    in one vectorized booster call. Returns (contributions[n, n_features], bias[n]);
+    each row's contributions plus bias sum to the model's margin.
+    """
+    import xgboost as xgb
+
+    if not hasattr(model, "get_booster"):
+        raise TypeError(f"Tree contributions need an XGBoost model, got {type(model).__name__}")
+    booster = model.get_booster()
+    dmat = xgb.DMatrix(np.asarray(X, dtype=np.float32),
+                       feature_names=booster.feature_names, feature_types=booster.feature_types)
+    contribs = booster.predict(dmat, pred_contribs=True)
+    return contribs[:, :-1], contribs[:, -1]
+
+
+def unscale(scaler, X_scaled, feature_order, numeric_cols):
+    """Map scaled model inputs back to raw values using the fitted scaler; one-hot columns pass through."""
+    X_raw = np.array(X_scaled, dtype=np.float64, copy=True)
+    idx = [feature_order.index(c) for c in numeric_cols]
+    if idx:
+        X_raw[:, idx] = scaler.inverse_transform(X_raw[:, idx])
+    return X_raw
+
+
+def explain_rows(model, scaler, X_scaled, feature_order, numeric_cols):
+    """Probability, bias and named (raw value, contribution) pairs for each row."""
+    contribs, bias = tree_contributions(model, X_scaled)
+    probs = 1.0 / (1.0 + np.exp(-(contribs.sum(axis=1) + bias)))
+    X_raw = unscale(scaler, X_scaled, feature_order, numeric_cols)
+    return [
+        {
+            "probability": float(probs[i]),
+            "base_value": float(bias[i]),
+            "contributions": [
+                {"feature": f, "value": float(X_raw[i, j]), "contribution": float(contribs[i, j])}
+                for j, f in enumerate(feature_order)
+            ],
+        }
+        for i in range(len(probs))
+    ]
+
+
+class ResultCache:
+    """
+    Small thread-safe LRU for per-transaction results (predictions and explanations).
+    Keys should include the model version so a hot-swap never serves stale entries.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
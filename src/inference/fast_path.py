@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class NumpyMLPStudent:
+    """
+    FraudDetectionMLP-shaped student evaluated with plain NumPy matmuls.
+    Exposes the sklearn predict_proba interface so it can replace the XGBoost
+    model anywhere the server loads one (e.g. MODEL_PATH=artifacts/xgb_student.joblib),
+    without importing torch or building pandas/DMatrix objects per call.
+    """
+
+    def __init__(self, weights, biases):
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.n_features_in_ = self.weights[0].shape[0]
+
+    @classmethod
+    def from_torch(cls, model):
+        """Copy fc1..fc3 out of a trained FraudDetectionMLP (dropout is a no-op at inference)."""
+        layers = [model.fc1, model.fc2, model.fc3]
+        return cls(
+            [l.weight.detach().cpu().numpy().T for l in layers],
+            [l.bias.detach().cpu().numpy() for l in layers],
+        )
+
+    def predict_proba(self, X):
+        h = np.asarray(X, dtype=np.float32)
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            h = np.maximum(h @ w + b, 0.0)
+        p = _sigmoid(h @ self.weights[-1] + self.biases[-1]).ravel()
+        return np.column_stack([1 - p, p])
+
+
+class BoosterStudent:
+    """
+    Shallow gradient-boosted student served through Booster.inplace_predict,
+    which skips the DMatrix construction and sklearn wrapper overhead.
+    """
+
+    def __init__(self, booster):
+        self.booster = booster
+        self.n_features_in_ = booster.num_features()
+
+    def predict_proba(self, X):
+        p = self.booster.inplace_predict(np.asarray(X, dtype=np.float32))
+        return np.column_stack([1 - p, p])
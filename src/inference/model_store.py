@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.inference.predict import load_artifacts
+
+
+class ModelBundle:
+    """
+    One loaded, validated and warmed artifact set (model + scaler + feature meta).
+    Bundles are never mutated after loading, so a request that grabbed a
+    reference keeps a consistent view even if a newer bundle is swapped in.
+    """
+
+    def __init__(self, model, scaler, meta, version, paths):
+        self.model = model
+        self.scaler = scaler
+        self.meta = meta
+        self.version = version
+        self.paths = paths
+        self.numeric_cols = list(meta.get("numeric_cols", []))
+        self.loaded_at = time.time()
+
+
+def artifact_version(*paths):
+    """
+    Short content hash over every artifact file, used as the public model version.
+    Swapping any one of them (e.g. only the scaler) changes the version, so
+    version-keyed caches and the drift monitor never outlive a swap.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        h.update(b"\0")  # separator so content can't shift between files
+    return h.hexdigest()[:12]
+
+
+def validate_bundle(model, scaler, meta, expected_columns):
+    """Raise ValueError if the artifacts disagree with each other or with the API's feature order."""
+    all_columns = list(meta.get("all_columns", []))
+    numeric_cols = list(meta.get("numeric_cols", []))
+
+    if expected_columns is not None and all_columns != list(expected_columns):
+        raise ValueError(f"feature_cols.json columns {all_columns} do not match API feature order {list(expected_columns)}")
+
+    scaler_cols = getattr(scaler, "feature_names_in_", None)
+    if scaler_cols is not None and list(scaler_cols) != numeric_cols:
+        raise ValueError(f"Scaler was fit on {list(scaler_cols)}, feature meta expects {numeric_cols}")
+
+    n_model = getattr(model, "n_features_in_", None)
+    if n_model is not None and n_model != len(all_columns):
+        raise ValueError(f"Model expects {n_model} features, feature meta has {len(all_columns)}")
+
+    if not hasattr(model, "predict_proba"):
+        raise ValueError("Model does not implement predict_proba")
+
+
+def warm_bundle(bundle, n_rows=64):
+    """Run a sample batch through scaler + model so first live requests don't pay lazy-init costs."""
+    all_columns = bundle.meta["all_columns"]
+    X = np.zeros((n_rows, len(all_columns)), dtype=np.float32)
+    if bundle.numeric_cols:
+        raw = pd.DataFrame(np.zeros((n_rows, len(bundle.numeric_cols))), columns=bundle.numeric_cols)
+        X[:, [all_columns.index(c) for c in bundle.numeric_cols]] = bundle.scaler.transform(raw)
+    probs = bundle.model.predict_proba(X)
+    if probs.shape != (n_rows, 2) or not np.all(np.isfinite(probs)):
+        raise ValueError(f"Warm-up batch produced invalid output with shape {probs.shape}")
+
+
+def load_bundle(model_path, scaler_path, feature_path, expected_columns=None, n_jobs=None):
+    """Load, validate and warm a new artifact set. Runs entirely off the live reference."""
+    model, scaler, meta = load_artifacts(model_path, scaler_path, feature_path)
+    validate_bundle(model, scaler, meta, expected_columns)
+    # Cap per-model threads so N workers x n_jobs doesn't oversubscribe the cores
+    if n_jobs is not None and "n_jobs" in getattr(model, "get_params", dict)():
+        model.set_params(n_jobs=n_jobs)
+    bundle = ModelBundle(
+        model, scaler, meta,
+        version=artifact_version(model_path, scaler_path, feature_path),
+        paths={"model": model_path, "scaler": scaler_path, "features": feature_path},
+    )
+    warm_bundle(bundle)
+    return bundle
+
+
+class ModelStore:
+    """
+    Holds the live ModelBundle and swaps it atomically.
+    Readers take `store.current` once per request and use that reference
+    throughout, so in-flight requests finish on the bundle they started with.
+    """
+
+    def __init__(self, expected_columns=None, n_jobs=None):
+        self.expected_columns = expected_columns
+        self.n_jobs = n_jobs
+        self._current = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self.last_error = None
+
+    @property
+    def current(self):
+        return self._current
+
+    def reload(self, model_path, scaler_path, feature_path):
+        """Load a new bundle and swap it in. On failure the live bundle is left untouched."""
+        with self._reload_lock:
+            try:
+                bundle = load_bundle(model_path, scaler_path, feature_path, self.expected_columns, self.n_jobs)
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+            self._current = bundle
+            self.last_error = None
+            return bundle
+
+    def _artifact_mtimes(self, paths):
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+    def start_watcher(self, model_path, scaler_path, feature_path, interval=10.0):
+        """Poll the artifact files and hot-swap when any of them changes on disk."""
+        if self._watcher is not None:
+            return
+        paths = (model_path, scaler_path, feature_path)
+
+        def watch():
+            seen = self._artifact_mtimes(paths)
+            while not self._stop.wait(interval):
+                mtimes = self._artifact_mtimes(paths)
+                if mtimes == seen or None in mtimes:
+                    continue
+                seen = mtimes
+                try:
+                    bundle = self.reload(*paths)
+                    print(f" Hot-swapped model → version {bundle.version}")
+                except Exception as e:
+                    print(f" Rejected new artifacts, keeping current model: {e}")
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+        self._watcher = None
@@ -0,0 +1,279 @@
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+_current = contextvars.ContextVar("request_trace", default=None)
+PROFILE_SUFFIXES = (".collapsed", ".speedscope.json")
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class RequestTrace:
+    """Stage timings (and, if sampled, the profiled threads) of one request."""
+
+    def __init__(self, sampled):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.sampled = sampled
+        self.threads = {threading.get_ident()}
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ("trace", "name", "t0")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        if self.trace.sampled:
+            self.trace.threads.add(threading.get_ident())
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class StageStats:
+    """Bounded per-stage latency history (ring buffer) for the admin summary."""
+
+    def __init__(self, size=2048):
+        self.size = size
+        self._buffers = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, stages):
+        with self._lock:
+            for name, seconds in stages.items():
+                buf = self._buffers.get(name)
+                if buf is None:
+                    buf = self._buffers[name] = np.zeros(self.size)
+                buf[self._counts[name] % self.size] = seconds
+                self._counts[name] += 1
+
+    def summary(self):
+        with self._lock:
+            out = {}
+            for name, buf in self._buffers.items():
+                n = self._counts[name]
+                ms = buf[:min(n, self.size)] * 1000
+                out[name] = {
+                    "count": n,
+                    "mean_ms": float(ms.mean()),
+                    "p50_ms": float(np.percentile(ms, 50)),
+                    "p99_ms": float(np.percentile(ms, 99)),
+                    "max_ms": float(ms.max()),
+                }
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._buffers.clear()
+            self._counts.clear()
+
+
+class StackSampler(threading.Thread):
+    """Statistical profiler: samples the stacks of a request's threads every `interval` seconds."""
+
+    def __init__(self, trace, interval):
+        super().__init__(name="request-profiler", daemon=True)
+        self.trace = trace
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.trace.threads):
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples.append(tuple(reversed(stack)))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1)
+
+
+def write_collapsed(path, samples):
+    with open(path, "w") as f:
+        for stack, count in Counter(samples).items():
+            f.write(";".join(stack) + f" {count}\n")
+
+
+def write_speedscope(path, samples, interval, name):
+    frame_index = {}
+    frames = []
+    encoded = []
+    for stack in samples:
+        row = []
+        for fr in stack:
+            if fr not in frame_index:
+                frame_index[fr] = len(frames)
+                frames.append({"name": fr})
+            row.append(frame_index[fr])
+        encoded.append(row)
+    with open(path, "w") as f:
+        json.dump({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "seconds",
+                "startValue": 0, "endValue": interval * len(encoded),
+                "samples": encoded, "weights": [interval] * len(encoded),
+            }],
+        }, f)
+
+
+class Tracer:
+    """
+    Opt-in request instrumentation, reconfigurable at runtime.
+
+    enabled       record per-stage spans on every request (Server-Timing header + stats)
+    sample_every  profile 1 in N requests (0 = off) into `out_dir`
+    fmt           "collapsed" (flamegraph.pl / speedscope import) or "speedscope"
+    max_files     profiles kept in out_dir; oldest are deleted first
+
+    With both switches off, span() returns a shared no-op and the middleware
+    passes requests straight through.
+    """
+
+    def __init__(self, out_dir, enabled=False, sample_every=0, interval=0.001, fmt="collapsed", max_files=200):
+        self.out_dir = out_dir
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self.interval = interval
+        self.fmt = fmt
+        self.max_files = max_files
+        self.stats = StageStats()
+        self._counter = itertools.count()
+
+    @property
+    def active(self):
+        return self.enabled or self.sample_every > 0
+
+    def configure(self, **settings):
+        for key, value in settings.items():
+            if value is not None:
+                setattr(self, key, value)
+
+    def span(self, name):
+        trace = _current.get()
+        if trace is None:
+            return _NOOP
+        return _Span(trace, name)
+
+    def mark(self, name):
+        """Record time since request start as a stage (e.g. body parsing before the handler runs)."""
+        trace = _current.get()
+        if trace is not None and name not in trace.stages:
+            trace.add(name, time.perf_counter() - trace.start)
+
+    def begin(self):
+        n = next(self._counter)
+        sampled = self.sample_every > 0 and n % self.sample_every == 0
+        trace = RequestTrace(sampled)
+        token = _current.set(trace)
+        sampler = None
+        if sampled:
+            sampler = StackSampler(trace, self.interval)
+            sampler.start()
+        return trace, token, sampler
+
+    def end(self, trace, token, sampler, label):
+        _current.reset(token)
+        trace.add("total", time.perf_counter() - trace.start)
+        if self.enabled:
+            self.stats.record(trace.stages)
+        if sampler is not None:
+            sampler.stop()
+            if sampler.samples:
+                try:
+                    self._write_profile(sampler.samples, label)
+                except OSError as e:
+                    # Profiling must never fail the request it observed
+                    print(f" Could not write profile: {e}")
+
+    def _write_profile(self, samples, label):
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{time.perf_counter_ns() % 10**6:06d}"
+        safe = label.strip("/").replace("/", "_") or "root"
+        if self.fmt == "speedscope":
+            write_speedscope(os.path.join(self.out_dir, f"{stamp}-{safe}.speedscope.json"),
+                             samples, self.interval, label)
+        else:
+            write_collapsed(os.path.join(self.out_dir, f"{stamp}-{safe}.collapsed"), samples)
+        self._rotate()
+
+    def _rotate(self):
+        # Only our own profiles; other workers may be rotating the same directory concurrently
+        files = []
+        for name in os.listdir(self.out_dir):
+            if not name.endswith(PROFILE_SUFFIXES):
+                continue
+            path = os.path.join(self.out_dir, name)
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: zero work when the tracer is inactive, Server-Timing header when enabled."""
+
+    def __init__(self, app, tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.active:
+            return await self.app(scope, receive, send)
+
+        trace, token, sampler = self.tracer.begin()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.tracer.enabled and trace.stages:
+                timing = ", ".join(f"{k};dur={v * 1000:.3f}" for k, v in trace.stages.items())
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.tracer.end(trace, token, sampler, scope.get("path", ""))
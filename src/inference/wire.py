@@ -0,0 +1,166 @@
+"""
+Compact wire formats for high-volume scoring clients.
+
+Raw (Content-Type: application/octet-stream), all little-endian:
+    request:  header "<4sIHH" = (b"FQS1", n_rows, n_cols=3, reserved=0)
+              then n_rows x 3 float32: type_code, amount, account_age
+    response: header "<4sI"   = (b"FQR1", n_rows)
+              then n_rows float32 probabilities, then n_rows uint8 labels
+
+MessagePack (Content-Type: application/x-msgpack), columnar:
+    request:  {"type": [str | int code, ...] or bytes(uint8 codes),
+               "amount": [float, ...] or bytes(float32 LE),
+               "account_age": optional, same shape as amount}
+    response: {"model_version": str, "probability": bytes(float32 LE), "label": bytes(uint8)}
+
+type_code indexes TX_TYPES. Both decoders reject more than MAX_ROWS rows per request.
+"""
+import struct
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for the MessagePack content type
+    msgpack = None
+
+TX_TYPES = ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"]
+TYPE_CODES = {t: i for i, t in enumerate(TX_TYPES)}
+
+RAW_CONTENT_TYPE = "application/octet-stream"
+MSGPACK_CONTENT_TYPES = ("application/x-msgpack", "application/msgpack", "application/vnd.msgpack")
+
+_REQ_HEADER = struct.Struct("<4sIHH")
+_RESP_HEADER = struct.Struct("<4sI")
+_REQ_MAGIC = b"FQS1"
+_RESP_MAGIC = b"FQR1"
+_N_COLS = 3
+
+MAX_ROWS = 100_000
+
+
+class BatchTooLarge(ValueError):
+    """Request holds more rows than the server accepts in one call."""
+
+
+def check_rows(n_rows, max_rows=MAX_ROWS):
+    if n_rows > max_rows:
+        raise BatchTooLarge(f"Batch of {n_rows} rows exceeds the limit of {max_rows}")
+
+
+def max_body_bytes(max_rows=MAX_ROWS):
+    """Largest valid raw request body; lets the server refuse oversized uploads from Content-Length alone."""
+    return _REQ_HEADER.size + max_rows * _N_COLS * 4
+
+
+def validate_columns(type_codes, amounts):
+    """Vectorized checks shared by both formats; raises ValueError naming the first bad row."""
+    bad = ~np.isin(type_codes, np.arange(len(TX_TYPES)))
+    if bad.any():
+        raise ValueError(f"Invalid type code at row {int(np.argmax(bad))}")
+    bad = ~np.isfinite(amounts) | (amounts < 0)
+    if bad.any():
+        raise ValueError(f"Invalid amount at row {int(np.argmax(bad))}")
+
+
+def encode_rows(type_codes, amounts, account_ages=None):
+    amounts = np.asarray(amounts, dtype="<f4")
+    ages = np.zeros_like(amounts) if account_ages is None else np.asarray(account_ages, dtype="<f4")
+    rows = np.column_stack([np.asarray(type_codes, dtype="<f4"), amounts, ages]).astype("<f4")
+    return _REQ_HEADER.pack(_REQ_MAGIC, len(rows), _N_COLS, 0) + rows.tobytes()
+
+
+def decode_rows(body, max_rows=MAX_ROWS):
+    """Raw request body -> (type_codes int, amounts float64), read straight from the payload buffer."""
+    if len(body) < _REQ_HEADER.size:
+        raise ValueError("Body shorter than header")
+    magic, n_rows, n_cols, _ = _REQ_HEADER.unpack_from(body)
+    if magic != _REQ_MAGIC:
+        raise ValueError(f"Bad magic {magic!r}")
+    if n_cols != _N_COLS:
+        raise ValueError(f"Expected {_N_COLS} columns, got {n_cols}")
+    check_rows(n_rows, max_rows)
+    expected = _REQ_HEADER.size + n_rows * n_cols * 4
+    if len(body) != expected:
+        raise ValueError(f"Body is {len(body)} bytes, header implies {expected}")
+
+    rows = np.frombuffer(body, dtype="<f4", offset=_REQ_HEADER.size).reshape(n_rows, n_cols)
+    codes_f = rows[:, 0]
+    if not np.all(codes_f == np.round(codes_f)):
+        raise ValueError("Type codes must be integers")
+    type_codes = codes_f.astype(np.int64)
+    amounts = rows[:, 1].astype(np.float64)
+    validate_columns(type_codes, amounts)
+    return type_codes, amounts
+
+
+def encode_scores(probs, labels):
+    probs = np.asarray(probs, dtype="<f4")
+    return (_RESP_HEADER.pack(_RESP_MAGIC, len(probs)) + probs.tobytes()
+            + np.asarray(labels, dtype=np.uint8).tobytes())
+
+
+def decode_scores(body):
+    magic, n = _RESP_HEADER.unpack_from(body)
+    if magic != _RESP_MAGIC:
+        raise ValueError(f"Bad magic {magic!r}")
+    probs = np.frombuffer(body, dtype="<f4", count=n, offset=_RESP_HEADER.size)
+    labels = np.frombuffer(body, dtype=np.uint8, count=n, offset=_RESP_HEADER.size + 4 * n)
+    return probs, labels
+
+
+def _column(value, dtype):
+    if isinstance(value, (bytes, bytearray)):
+        return np.frombuffer(value, dtype=dtype)
+    return np.asarray(value)
+
+
+def decode_msgpack(body, max_rows=MAX_ROWS):
+    """MessagePack request body -> (type_codes int, amounts float64)."""
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed")
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except Exception as e:
+        raise ValueError(f"Invalid MessagePack body: {e}")
+    if not isinstance(payload, dict) or "type" not in payload or "amount" not in payload:
+        raise ValueError('Expected a map with "type" and "amount" columns')
+
+    try:
+        types = _column(payload["type"], np.uint8)
+        amounts = _column(payload["amount"], "<f4").astype(np.float64)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Malformed column: {e}")
+
+    if types.ndim != 1:
+        raise ValueError("type column must be one-dimensional")
+    if types.size == 0:
+        type_codes = np.zeros(0, dtype=np.int64)
+    elif types.dtype.kind in "US":
+        types = np.char.upper(types.astype(str))
+        type_codes = np.array([TYPE_CODES.get(t, -1) for t in types], dtype=np.int64)
+    elif types.dtype.kind in "iu":
+        type_codes = types.astype(np.int64)
+    else:
+        raise ValueError("type column must be strings or integer codes")
+
+    if amounts.ndim != 1 or len(amounts) != len(type_codes):
+        raise ValueError("type and amount columns must have the same length")
+    check_rows(len(type_codes), max_rows)
+    validate_columns(type_codes, amounts)
+    return type_codes, amounts
+
+
+def encode_msgpack_rows(type_codes, amounts):
+    return msgpack.packb({
+        "type": np.asarray(type_codes, dtype=np.uint8).tobytes(),
+        "amount": np.asarray(amounts, dtype="<f4").tobytes(),
+    })
+
+
+def encode_msgpack_scores(probs, labels, model_version):
+    return msgpack.packb({
+        "model_version": model_version,
+        "probability": np.asarray(probs, dtype="<f4").tobytes(),
+        "label": np.asarray(labels, dtype=np.uint8).tobytes(),
+    })
@@ -0,0 +1,185 @@
+import time
+
+import numpy as np
+
+
+def _take(X, idx):
+    """Row-select from a DataFrame or array."""
+    return X.iloc[idx] if hasattr(X, "iloc") else X[idx]
+
+
+def sklearn_stage(model):
+    """Adapt an sklearn / XGBoost classifier to a stage scoring function."""
+    def predict(X):
+        return model.predict_proba(X)[:, 1]
+    return predict
+
+
+def torch_stage(model, columns=None):
+    """
+    Adapt a torch model that outputs sigmoid probabilities (FraudDetectionMLP,
+    QuantumClassifier) to a stage scoring function. `columns` selects the input
+    features the model was trained on, e.g. slice(0, 3) for the 3-qubit model.
+    """
+    import torch
+
+    model.eval()
+
+    def predict(X):
+        arr = np.asarray(X, dtype=np.float32)
+        if columns is not None:
+            arr = arr[:, columns]
+        with torch.no_grad():
+            return model(torch.from_numpy(np.ascontiguousarray(arr))).numpy().flatten()
+    return predict
+
+
+class CascadeStage:
+    def __init__(self, name, predict_fn, cost=None, low=0.0, high=1.0):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.cost = cost        # relative cost per row; measured seconds/row if None
+        self.low = low          # p < low  -> decided legitimate at this stage
+        self.high = high        # p >= high -> decided fraud at this stage
+
+
+class CascadeScorer:
+    """
+    Scores rows with the cheapest model first. Rows whose probability falls
+    inside a stage's [low, high) band are escalated, as one batch, to the next
+    stage; the last stage decides everything that reaches it.
+    """
+
+    def __init__(self, stages, threshold=0.5):
+        if not stages:
+            raise ValueError("CascadeScorer needs at least one stage")
+        self.stages = stages
+        self.threshold = threshold
+        self.check_bands()
+
+    def check_bands(self):
+        """
+        A row decided early keeps that stage's probability, so every band must
+        straddle the decision threshold: otherwise "decided legitimate" rows
+        could come out labelled fraud (or the reverse).
+        """
+        for stage in self.stages[:-1]:
+            if not stage.low <= self.threshold <= stage.high:
+                raise ValueError(f"Stage {stage.name!r} band [{stage.low}, {stage.high}) "
+                                 f"does not contain the threshold {self.threshold}")
+
+    def score(self, X):
+        """Return (probabilities, stats) where stats has per-stage escalation and cost figures."""
+        n = len(X)
+        probs = np.zeros(n, dtype=np.float64)
+        decided_by = np.full(n, -1, dtype=np.int16)
+        pending = np.arange(n)
+        stage_stats = []
+
+        for i, stage in enumerate(self.stages):
+            if len(pending) == 0:
+                stage_stats.append({"name": stage.name, "rows": 0, "seconds": 0.0})
+                continue
+            start = time.perf_counter()
+            p = np.asarray(stage.predict_fn(_take(X, pending)), dtype=np.float64)
+            elapsed = time.perf_counter() - start
+            stage_stats.append({"name": stage.name, "rows": int(len(pending)), "seconds": elapsed})
+
+            if i == len(self.stages) - 1:
+                decide = np.ones(len(pending), dtype=bool)
+            else:
+                decide = (p < stage.low) | (p >= stage.high)
+            probs[pending[decide]] = p[decide]
+            decided_by[pending[decide]] = i
+            pending = pending[~decide]
+
+        return probs, self._summarize(n, stage_stats, decided_by)
+
+    def predict(self, X):
+        probs, _ = self.score(X)
+        return (probs >= self.threshold).astype(int)
+
+    def _summarize(self, n, stage_stats, decided_by):
+        total_units = 0.0
+        total_seconds = 0.0
+        for i, s in enumerate(stage_stats):
+            stage = self.stages[i]
+            per_row = s["seconds"] / s["rows"] if s["rows"] else 0.0
+            s["seconds_per_row"] = per_row
+            s["decided"] = int(np.sum(decided_by == i))
+            s["escalation_rate"] = (s["rows"] - s["decided"]) / s["rows"] if s["rows"] else 0.0
+            total_seconds += s["seconds"]
+            if stage.cost is not None:
+                total_units += stage.cost * s["rows"]
+        return {
+            "rows": n,
+            "stages": stage_stats,
+            "escalated_fraction": 1 - stage_stats[0]["decided"] / n if n else 0.0,
+            "seconds_per_row": total_seconds / n if n else 0.0,
+            "cost_per_row": total_units / n if n and all(s.cost is not None for s in self.stages) else None,
+        }
+
+
+def _low_edge(p, y, max_lost_frauds):
+    """Largest edge such that at most `max_lost_frauds` true frauds fall strictly below it."""
+    fraud_p = np.sort(p[y == 1])
+    if len(fraud_p) == 0:
+        return 0.0
+    k = int(max_lost_frauds)
+    return float(fraud_p[k]) if k < len(fraud_p) else 1.0
+
+
+def _high_edge(p, y, min_precision):
+    """Smallest edge whose auto-flagged rows (p >= edge) keep precision >= min_precision."""
+    order = np.argsort(-p)
+    p_sorted, y_sorted = p[order], y[order]
+    precision = np.cumsum(y_sorted) / np.arange(1, len(y_sorted) + 1)
+    # Only cut between distinct probabilities so ties are never split
+    last_of_run = np.r_[p_sorted[1:] != p_sorted[:-1], True]
+    ok = np.where((precision >= min_precision) & last_of_run)[0]
+    if len(ok) == 0:
+        return np.inf
+    return float(p_sorted[ok.max()])
+
+
+def calibrate_bands(scorer, X_val, y_val, max_recall_loss=0.01, min_precision=0.95, measure_cost=True,
+                    cost_rows=5000, seed=0):
+    """
+    Set each non-final stage's band on the validation split.
+
+    The recall budget (fraction of validation frauds allowed to be cleared by
+    a cheap stage instead of reaching the final model) is split evenly across
+    the non-final stages. The upper edge is the lowest probability at which
+    the stage's own flags stay at `min_precision`. Both edges are clamped so
+    low <= threshold <= high, keeping early decisions consistent with the
+    labels predict() outputs. If `measure_cost` is set, stages without an
+    explicit cost get their seconds/row measured on the same fixed sample of
+    `cost_rows` validation rows, so every stage has a cost even when earlier
+    stages decide all validation rows.
+    """
+    y_val = np.asarray(y_val).astype(int)
+    n_frauds = int(y_val.sum())
+    n_gating = len(scorer.stages) - 1
+    budget_per_stage = (max_recall_loss * n_frauds / n_gating) if n_gating else 0
+
+    if measure_cost and len(y_val):
+        sample = np.sort(np.random.default_rng(seed).choice(len(y_val), min(cost_rows, len(y_val)), replace=False))
+        X_cost = _take(X_val, sample)
+        for stage in scorer.stages:
+            if stage.cost is None:
+                stage.predict_fn(_take(X_cost, np.arange(min(16, len(sample)))))  # warm-up, not timed
+                start = time.perf_counter()
+                stage.predict_fn(X_cost)
+                stage.cost = (time.perf_counter() - start) / len(sample)
+
+    pending = np.arange(len(y_val))
+    for stage in scorer.stages[:n_gating]:
+        if len(pending) == 0:
+            break
+        p = np.asarray(stage.predict_fn(_take(X_val, pending)), dtype=np.float64)
+        y = y_val[pending]
+        stage.low = min(_low_edge(p, y, np.floor(budget_per_stage)), scorer.threshold)
+        stage.high = max(_high_edge(p, y, min_precision), scorer.threshold)
+        pending = pending[(p >= stage.low) & (p < stage.high)]
+
+    return [{"name": s.name, "low": s.low, "high": s.high, "cost": s.cost} for s in scorer.stages]
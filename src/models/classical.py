@@ -4,29 +4,35 @@ from sklearn.ensemble import RandomForestClassifier
 import xgboost as xgb
 
 
-def build_logistic():
-    """Return a Logistic Regression model."""
-    return LogisticRegression(class_weight='balanced', max_iter=1000)
+def build_logistic(**overrides):
+    """Return a Logistic Regression model. Keyword arguments override the defaults."""
+    params = dict(class_weight='balanced', max_iter=1000)
+    params.update(overrides)
+    return LogisticRegression(**params)
 
 
-def build_rf():
-    """Return a Random Forest model."""
-    return RandomForestClassifier(
+def build_rf(**overrides):
+    """Return a Random Forest model. Keyword arguments override the defaults."""
+    params = dict(
         n_estimators=200,
         class_weight='balanced',
         n_jobs=-1,
         random_state=42
     )
+    params.update(overrides)
+    return RandomForestClassifier(**params)
 
 
-def build_xgb():
-    """Return an XGBoost model."""
-    return xgb.XGBClassifier(
+def build_xgb(**overrides):
+    """Return an XGBoost model. Keyword arguments override the defaults."""
+    params = dict(
         n_estimators=200,
         eval_metric='logloss',
         use_label_encoder=False,
         random_state=42
     )
+    params.update(overrides)
+    return xgb.XGBClassifier(**params)
 
 
 def save_model(model, path):
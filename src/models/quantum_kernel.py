@@ -0,0 +1,146 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pennylane as qml
+from sklearn.svm import SVC
+
+
+def encode_states(X, n_qubits=3, n_features=3):
+    """
+    Statevectors for the same RY angle encoding QuantumClassifier uses.
+    Computed once per sample (broadcast over the batch in one QNode call), so
+    every kernel entry afterwards is just an inner product.
+    """
+    dev = qml.device("default.qubit", wires=n_qubits)
+
+    @qml.qnode(dev)
+    def circuit(inputs):
+        for i in range(n_features):
+            qml.RY(inputs[:, i], wires=i % n_qubits)
+        return qml.state()
+
+    X = np.asarray(X, dtype=np.float64)
+    states = np.asarray(circuit(X), dtype=np.complex128)
+    return states.reshape(len(X), 2 ** n_qubits)
+
+
+def _kernel_tile(a, b):
+    """Fidelity kernel |<a_i|b_j>|^2 for one tile of statevectors."""
+    return np.abs(a.conj() @ b.T) ** 2
+
+
+class TileCache:
+    """On-disk cache of kernel tiles keyed by the content hash of both row blocks."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def block_key(block):
+        return hashlib.sha1(np.ascontiguousarray(block).tobytes()).hexdigest()[:16]
+
+    def _path(self, ka, kb):
+        return os.path.join(self.cache_dir, f"{ka}_{kb}.npy")
+
+    def get(self, ka, kb):
+        if not self.cache_dir:
+            return None
+        if os.path.exists(self._path(ka, kb)):
+            return np.load(self._path(ka, kb))
+        if os.path.exists(self._path(kb, ka)):
+            return np.load(self._path(kb, ka)).T
+        return None
+
+    def put(self, ka, kb, tile):
+        if self.cache_dir:
+            np.save(self._path(ka, kb), tile)
+
+
+def compute_gram(states_a, states_b=None, tile_size=512, n_workers=None, cache_dir=None):
+    """
+    Kernel matrix between two sets of statevectors, computed tile by tile
+    across a process pool. With states_b=None the matrix is symmetric and only
+    the upper-triangle tiles are computed. Tiles found in `cache_dir` are
+    reused, so re-runs and test-vs-train kernels skip work already done.
+    """
+    symmetric = states_b is None
+    if symmetric:
+        states_b = states_a
+    cache = TileCache(cache_dir)
+
+    a_blocks = [(s, min(s + tile_size, len(states_a))) for s in range(0, len(states_a), tile_size)]
+    b_blocks = [(s, min(s + tile_size, len(states_b))) for s in range(0, len(states_b), tile_size)]
+    a_keys = [cache.block_key(states_a[s:e]) for s, e in a_blocks]
+    b_keys = [cache.block_key(states_b[s:e]) for s, e in b_blocks]
+
+    K = np.empty((len(states_a), len(states_b)), dtype=np.float64)
+    todo = []
+    for i, (a0, a1) in enumerate(a_blocks):
+        for j, (b0, b1) in enumerate(b_blocks):
+            if symmetric and j < i:
+                continue
+            cached = cache.get(a_keys[i], b_keys[j])
+            if cached is not None:
+                K[a0:a1, b0:b1] = cached
+            else:
+                todo.append((i, j))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {
+                pool.submit(_kernel_tile, states_a[a_blocks[i][0]:a_blocks[i][1]],
+                            states_b[b_blocks[j][0]:b_blocks[j][1]]): (i, j)
+                for i, j in todo
+            }
+            for fut, (i, j) in futures.items():
+                tile = fut.result()
+                (a0, a1), (b0, b1) = a_blocks[i], b_blocks[j]
+                K[a0:a1, b0:b1] = tile
+                cache.put(a_keys[i], b_keys[j], tile)
+
+    if symmetric:
+        for i, (a0, a1) in enumerate(a_blocks):
+            for j, (b0, b1) in enumerate(b_blocks[:i]):
+                K[a0:a1, b0:b1] = K[b0:b1, a0:a1].T
+    return K
+
+
+class QuantumKernelSVM:
+    """
+    SVM on a precomputed quantum fidelity kernel.
+    Alternative to the variational QuantumClassifier: no per-sample circuit
+    training, just one state preparation per sample and a Gram matrix.
+    """
+
+    def __init__(self, n_qubits=3, n_features=3, C=1.0, tile_size=512, n_workers=None, cache_dir=None):
+        self.n_qubits = n_qubits
+        self.n_features = n_features
+        self.tile_size = tile_size
+        self.n_workers = n_workers
+        self.cache_dir = cache_dir
+        self.svc = SVC(kernel="precomputed", C=C, class_weight="balanced", probability=True, random_state=42)
+        self.train_states = None
+
+    def _states(self, X):
+        return encode_states(X, self.n_qubits, self.n_features)
+
+    def fit(self, X, y):
+        self.train_states = self._states(X)
+        K = compute_gram(self.train_states, tile_size=self.tile_size,
+                         n_workers=self.n_workers, cache_dir=self.cache_dir)
+        self.svc.fit(K, np.asarray(y).ravel())
+        return self
+
+    def kernel(self, X):
+        return compute_gram(self._states(X), self.train_states, tile_size=self.tile_size,
+                            n_workers=self.n_workers, cache_dir=self.cache_dir)
+
+    def predict_proba(self, X):
+        return self.svc.predict_proba(self.kernel(X))
+
+    def predict(self, X):
+        return self.svc.predict(self.kernel(X))
@@ -0,0 +1,246 @@
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from src.models.classical import build_logistic, build_rf, build_xgb
+
+MODELS = ("log", "rf", "xgb", "mlp")
+METRICS = ("accuracy", "precision", "recall", "f1", "roc_auc", "pr_auc")
+MLP_DEFAULTS = {"lr": 0.001, "batch_size": 512, "neg_rate": None, "epochs": 10}
+
+# Filled once per worker process with views onto the parent's shared-memory blocks
+_DATA = {}
+_SEGMENTS = []
+
+
+def load_data(splits=("train", "val")):
+    """Stack the processed splits into one pool to cross-validate over (test stays held out by default)."""
+    frames = [pd.read_csv(f"data/processed/{name}.csv") for name in splits]
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop(columns=['isFraud']).to_numpy(dtype=np.float32), df['isFraud'].to_numpy(dtype=np.int8)
+
+
+def share_array(arr):
+    """Copy an array into a new shared-memory block; returns (block, spec for attach_array)."""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def attach_array(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    _SEGMENTS.append(shm)  # keep the mapping alive as long as the view
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(specs, model_threads):
+    _DATA.update({key: attach_array(spec) for key, spec in specs.items()})
+    _DATA["model_threads"] = model_threads
+    try:
+        import torch
+        torch.set_num_threads(model_threads)
+    except ImportError:
+        pass
+
+
+def core_budget(n_tasks, n_jobs=None, fold_workers=None):
+    """Split n_jobs cores into concurrent fold workers x threads per model fit."""
+    n_jobs = n_jobs or os.cpu_count() or 1
+    fold_workers = fold_workers or min(n_tasks, n_jobs)
+    fold_workers = max(1, min(fold_workers, n_jobs))
+    return fold_workers, max(1, n_jobs // fold_workers)
+
+
+def run_fold(model_type, fold, test_idx, mlp_params):
+    """Fit one model on every row outside `test_idx`; return its out-of-fold probabilities."""
+    X, y = _DATA["X"], _DATA["y"]
+    threads = _DATA["model_threads"]
+    train_mask = np.ones(len(y), dtype=bool)
+    train_mask[test_idx] = False
+
+    start = time.perf_counter()
+    if model_type == "mlp":
+        import torch
+        from src.trainers.train_dl import fit_dl
+
+        # Early stopping needs its own validation rows: carve them out of the training fold, never the test fold
+        fit_idx, stop_idx = train_test_split(np.flatnonzero(train_mask), test_size=0.1,
+                                             stratify=y[train_mask], random_state=fold)
+
+        def tensors(idx):
+            return torch.from_numpy(X[idx]), torch.tensor(y[idx], dtype=torch.float32).unsqueeze(1)
+
+        model = fit_dl(*tensors(fit_idx), *tensors(stop_idx), random_state=42, **mlp_params)
+        with torch.no_grad():
+            probs = model(torch.from_numpy(X[test_idx])).numpy().flatten()
+    else:
+        if model_type == "log":
+            model = build_logistic()
+        elif model_type == "rf":
+            model = build_rf(n_jobs=threads)
+        else:
+            model = build_xgb(n_jobs=threads)
+        model.fit(X[train_mask], y[train_mask])
+        probs = model.predict_proba(X[test_idx])[:, 1]
+    return model_type, fold, np.asarray(probs, dtype=np.float32), time.perf_counter() - start
+
+
+def score_folds(y, probs, threshold=0.5):
+    """
+    All metrics for one fold from a single sort: thresholded counts plus
+    ROC-AUC and average precision over distinct score thresholds (matches sklearn, ties included).
+    """
+    y = np.asarray(y, dtype=bool)
+    probs = np.asarray(probs, dtype=np.float64)
+    pred = probs >= threshold
+    tp = np.sum(pred & y)
+    fp = np.sum(pred & ~y)
+    fn = np.sum(~pred & y)
+    n_pos, n_neg = y.sum(), (~y).sum()
+
+    order = np.argsort(-probs, kind="mergesort")
+    p_sorted, y_sorted = probs[order], y[order]
+    last = np.r_[np.flatnonzero(np.diff(p_sorted)), len(p_sorted) - 1]  # last row of each tied group
+    tps = np.cumsum(y_sorted)[last]
+    fps = (last + 1) - tps
+    tpr = np.r_[0, tps / max(n_pos, 1)]
+    fpr = np.r_[0, fps / max(n_neg, 1)]
+    precision = tps / (tps + fps)
+
+    precision_t = tp / max(tp + fp, 1)
+    recall_t = tp / max(n_pos, 1)
+    return {
+        "accuracy": float((tp + np.sum(~pred & ~y)) / len(y)),
+        "precision": float(precision_t),
+        "recall": float(recall_t),
+        "f1": float(2 * tp / max(2 * tp + fp + fn, 1)),
+        "roc_auc": float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)) if n_pos and n_neg else float("nan"),
+        "pr_auc": float(np.sum(np.diff(tpr) * precision)) if n_pos else float("nan"),
+    }
+
+
+def confidence_interval(values, level=0.95):
+    """Mean and Student-t interval across folds."""
+    values = np.asarray(values, dtype=np.float64)
+    mean = values.mean()
+    if len(values) < 2:
+        return mean, mean, mean
+    half = stats.t.ppf(0.5 + level / 2, len(values) - 1) * values.std(ddof=1) / np.sqrt(len(values))
+    return mean, mean - half, mean + half
+
+
+def comparison_table(fold_metrics, level=0.95):
+    rows = []
+    for model_type, folds in fold_metrics.items():
+        row = {"model": model_type}
+        for metric in METRICS:
+            mean, lo, hi = confidence_interval([f[metric] for f in folds], level)
+            row.update({metric: mean, f"{metric}_lo": lo, f"{metric}_hi": hi})
+        row["fit_seconds"] = float(np.mean([f["seconds"] for f in folds]))
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("pr_auc", ascending=False).reset_index(drop=True)
+
+
+def _interval(row, metric):
+    return f"{row[metric]:.4f} [{row[metric + '_lo']:.4f},{row[metric + '_hi']:.4f}]"
+
+
+def print_table(table, level):
+    print(f"\n Cross-validated comparison (mean [{level:.0%} t-interval])")
+    print(f"  {'model':<6}" + "".join(f"{m:>24}" for m in METRICS) + f"{'fit s':>9}")
+    for _, r in table.iterrows():
+        cells = "".join(f"{_interval(r, m):>24}" for m in METRICS)
+        print(f"  {r['model']:<6}{cells}{r['fit_seconds']:>9.1f}")
+
+
+def cross_validate(models=MODELS, n_splits=5, n_jobs=None, fold_workers=None, splits=("train", "val"),
+                   mlp_params=None, threshold=0.5, level=0.95, seed=42, out_dir="results/cv"):
+    """
+    Stratified k-fold comparison of the classical models and FraudDetectionMLP.
+    The data is copied once into shared memory and every (model, fold) fit runs
+    in a process pool sized by core_budget, so folds run concurrently while
+    each fit gets a fixed share of threads.
+    """
+    X, y = load_data(splits)
+    folds = [test_idx for _, test_idx in
+             StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed).split(np.zeros(len(y)), y)]
+    tasks = [(m, k) for m in models for k in range(n_splits)]
+    workers, threads = core_budget(len(tasks), n_jobs, fold_workers)
+    mlp_params = {**MLP_DEFAULTS, **(mlp_params or {})}
+    print(f"\n {n_splits}-fold CV on {len(y)} rows ({int(y.sum())} frauds) | "
+          f"{workers} concurrent fits x {threads} thread(s) each\n")
+
+    segments = []
+    fold_metrics = {m: [] for m in models}
+    start = time.perf_counter()
+    try:
+        shm_X, spec_X = share_array(X)
+        segments.append(shm_X)
+        shm_y, spec_y = share_array(y)
+        segments.append(shm_y)
+        del X  # workers read the shared copy from here on; the parent keeps only y for scoring
+
+        ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=({"X": spec_X, "y": spec_y}, threads)) as pool:
+            futures = [pool.submit(run_fold, m, k, folds[k], mlp_params) for m, k in tasks]
+            for fut in as_completed(futures):
+                model_type, k, probs, seconds = fut.result()
+                metrics = score_folds(y[folds[k]], probs, threshold)
+                fold_metrics[model_type].append({"fold": k, "seconds": seconds, **metrics})
+                print(f"  {model_type:<4} fold {k + 1}/{n_splits}: PR-AUC {metrics['pr_auc']:.4f} "
+                      f"ROC-AUC {metrics['roc_auc']:.4f} ({seconds:.1f}s)")
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    elapsed = time.perf_counter() - start
+
+    for folds_done in fold_metrics.values():
+        folds_done.sort(key=lambda f: f["fold"])
+    table = comparison_table(fold_metrics, level)
+    print_table(table, level)
+    print(f"\n Wall-clock {elapsed:.1f}s for {len(tasks)} fits")
+
+    os.makedirs(out_dir, exist_ok=True)
+    table.to_csv(os.path.join(out_dir, "cv_comparison.csv"), index=False)
+    with open(os.path.join(out_dir, "cv_results.json"), "w") as f:
+        json.dump({
+            "n_splits": n_splits, "seed": seed, "splits": list(splits), "threshold": threshold,
+            "confidence_level": level, "fold_workers": workers, "model_threads": threads,
+            "wall_seconds": elapsed, "mlp_params": mlp_params, "folds": fold_metrics,
+        }, f, indent=2)
+    print(f" Results saved in {out_dir}/cv_comparison.csv and cv_results.json")
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", default=",".join(MODELS), help=f"comma-separated subset of {MODELS}")
+    parser.add_argument("--n_splits", type=int, default=5)
+    parser.add_argument("--n_jobs", type=int, default=None, help="total cores to use (default: all)")
+    parser.add_argument("--fold_workers", type=int, default=None,
+                        help="concurrent fits; the remaining cores become threads per fit")
+    parser.add_argument("--include_test", action="store_true", help="also fold the test split into the CV pool")
+    parser.add_argument("--mlp_epochs", type=int, default=MLP_DEFAULTS["epochs"])
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--level", type=float, default=0.95, help="confidence level of the intervals")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out_dir", default="results/cv")
+    args = parser.parse_args()
+
+    models = [m.strip() for m in args.models.split(",")]
+    unknown = set(models) - set(MODELS)
+    if unknown:
+        parser.error(f"Unknown models {sorted(unknown)}; choose from {MODELS}")
+    splits = ("train", "val", "test") if args.include_test else ("train", "val")
+    cross_validate(models, args.n_splits, args.n_jobs, args.fold_workers, splits,
+                   {"epochs": args.mlp_epochs}, args.threshold, args.level, args.seed, args.out_dir)
@@ -0,0 +1,140 @@
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score
+from src.models.classical import load_model
+from src.inference.fast_path import NumpyMLPStudent, BoosterStudent
+
+
+def load_split(name):
+    df = pd.read_csv(f"data/processed/{name}.csv")
+    y = df['isFraud'].values
+    X = df.drop(columns=['isFraud'])
+    return X.columns, X.to_numpy(dtype=np.float32), y
+
+
+def perturb(X, numeric_idx, n_copies=2, noise=0.1, fraud_mask=None, fraud_copies=10, random_state=42):
+    """
+    Synthetic neighbours of the training rows: Gaussian noise on the (already
+    standardised) numeric columns, one-hot type columns left untouched.
+    Suspicious rows get extra copies so the student sees the decision boundary
+    and not just the legitimate bulk.
+    """
+    rng = np.random.default_rng(random_state)
+    base = [np.repeat(X, n_copies, axis=0)]
+    if fraud_mask is not None and fraud_mask.any():
+        base.append(np.repeat(X[fraud_mask], fraud_copies, axis=0))
+    X_syn = np.concatenate(base)
+    X_syn[:, numeric_idx] += rng.normal(0, noise, size=(len(X_syn), len(numeric_idx))).astype(np.float32)
+    return X_syn
+
+
+def fit_mlp_student(X, soft_y, epochs=5, batch_size=2048, lr=0.001):
+    import torch
+    import torch.nn as nn
+    from torch.utils.data import DataLoader, TensorDataset
+    from src.models.dl_model import FraudDetectionMLP
+
+    model = FraudDetectionMLP(X.shape[1])
+    criterion = nn.BCELoss()  # accepts soft targets
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    loader = DataLoader(
+        TensorDataset(torch.from_numpy(X), torch.from_numpy(soft_y.astype(np.float32)).unsqueeze(1)),
+        batch_size=batch_size, shuffle=True
+    )
+
+    model.train()
+    for epoch in range(epochs):
+        epoch_loss = 0.0
+        for xb, yb in loader:
+            optimizer.zero_grad()
+            loss = criterion(model(xb), yb)
+            loss.backward()
+            optimizer.step()
+            epoch_loss += loss.item()
+        print(f"Epoch {epoch+1}/{epochs} | Distillation Loss: {epoch_loss/len(loader):.5f}")
+
+    model.eval()
+    return NumpyMLPStudent.from_torch(model)
+
+
+def fit_gbm_student(X, soft_y, n_rounds=30, max_depth=3):
+    import xgboost as xgb
+
+    # binary:logistic accepts fractional labels, so the student regresses the teacher's probabilities directly
+    dtrain = xgb.DMatrix(X, label=soft_y)
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": max_depth, "eta": 0.3, "nthread": 1},
+        dtrain, num_boost_round=n_rounds
+    )
+    return BoosterStudent(booster)
+
+
+def single_row_latency(predict_fn, row, repeats=200):
+    predict_fn(row)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict_fn(row)
+    return (time.perf_counter() - start) / repeats
+
+
+def main(student_type="mlp", n_copies=2, noise=0.1):
+    print(f"\n Distilling XGBoost → {student_type.upper()} student...\n")
+
+    teacher = load_model("artifacts/xgb_model.joblib")
+    columns, X_train, _ = load_split("train")
+    _, X_test, y_test = load_split("test")
+    numeric_idx = [i for i, c in enumerate(columns) if not str(c).startswith("type_")]
+
+    # Soft labels from the teacher on train + perturbed neighbours
+    teacher_train = teacher.predict_proba(X_train)[:, 1]
+    X_syn = perturb(X_train, numeric_idx, n_copies, noise, fraud_mask=teacher_train >= 0.5)
+    X_fit = np.concatenate([X_train, X_syn])
+    soft_y = np.concatenate([teacher_train, teacher.predict_proba(X_syn)[:, 1]])
+    print(f" Distillation set: {len(X_train)} train + {len(X_syn)} synthetic rows")
+
+    if student_type == "gbm":
+        student = fit_gbm_student(X_fit, soft_y)
+    else:
+        student = fit_mlp_student(X_fit, soft_y)
+
+    # Agreement and quality gap on the held-out test split
+    teacher_test = teacher.predict_proba(X_test)[:, 1]
+    student_test = student.predict_proba(X_test)[:, 1]
+    agreement = np.mean((teacher_test >= 0.5) == (student_test >= 0.5))
+    fraud_agreement = np.mean((teacher_test >= 0.5)[y_test == 1] == (student_test >= 0.5)[y_test == 1])
+    pr_teacher = average_precision_score(y_test, teacher_test)
+    pr_student = average_precision_score(y_test, student_test)
+
+    row_df = pd.DataFrame(X_test[:1], columns=columns)
+    t_teacher = single_row_latency(teacher.predict_proba, row_df)
+    t_student = single_row_latency(student.predict_proba, X_test[:1])
+
+    print("\n Teacher / Student comparison (test):")
+    print(f"  Label agreement:        {agreement:.4f}")
+    print(f"  Agreement on frauds:    {fraud_agreement:.4f}")
+    print(f"  PR-AUC teacher:         {pr_teacher:.4f}")
+    print(f"  PR-AUC student:         {pr_student:.4f}")
+    print(f"  PR-AUC gap:             {pr_teacher - pr_student:+.4f}")
+    print(f"  Single-row latency:     {t_teacher * 1e6:.0f} µs → {t_student * 1e6:.0f} µs")
+
+    os.makedirs("artifacts", exist_ok=True)
+    joblib.dump(student, "artifacts/xgb_student.joblib")
+    joblib.dump({
+        "student_type": student_type, "agreement": agreement, "fraud_agreement": fraud_agreement,
+        "pr_auc_teacher": pr_teacher, "pr_auc_student": pr_student,
+        "latency_teacher_s": t_teacher, "latency_student_s": t_student,
+    }, "artifacts/xgb_student_metrics.joblib")
+    print(" Student saved → artifacts/xgb_student.joblib (serve with MODEL_PATH=artifacts/xgb_student.joblib)")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--student", default="mlp", choices=["mlp", "gbm"])
+    parser.add_argument("--n_copies", type=int, default=2)
+    parser.add_argument("--noise", type=float, default=0.1)
+    args = parser.parse_args()
+    main(args.student, args.n_copies, args.noise)
@@ -0,0 +1,126 @@
+import copy
+import os
+import random
+import numpy as np
+import torch
+
+
+def _rng_state():
+    return {
+        "torch": torch.get_rng_state(),
+        "numpy": np.random.get_state(),
+        "python": random.getstate(),
+    }
+
+
+def _set_rng_state(state):
+    torch.set_rng_state(state["torch"])
+    np.random.set_state(state["numpy"])
+    random.setstate(state["python"])
+
+
+def save_checkpoint(path, state):
+    """Write to a temp file and rename so a crash mid-save never leaves a corrupt checkpoint."""
+    tmp = path + ".tmp"
+    torch.save(state, tmp)
+    os.replace(tmp, path)
+
+
+def evaluate_loss(model, val_loader, val_loss):
+    """Mean validation loss, streamed batch by batch so X_val never has to fit through the model at once."""
+    model.eval()
+    total, count = 0.0, 0
+    with torch.no_grad():
+        for batch in val_loader:
+            loss_sum, n = val_loss(model, batch)
+            total += float(loss_sum)
+            count += n
+    return total / max(count, 1)
+
+
+def fit(model, optimizer, train_loss, make_loader, val_loader, val_loss,
+        epochs, patience=3, min_delta=0.0, checkpoint_dir=None, checkpoint_every=1, resume=True, config=None):
+    """
+    Shared epoch loop for the torch trainers.
+
+    train_loss(model, batch)  -> scalar loss tensor for one training batch
+    make_loader(epoch)        -> DataLoader for that epoch (lets callers resample per epoch)
+    val_loss(model, batch)    -> (sum of per-row losses, number of rows) for one validation batch
+
+    Stops once validation loss has not improved by `min_delta` for `patience`
+    epochs and restores the best weights. With `checkpoint_dir` set, model,
+    optimizer, RNG and early-stopping state are saved every `checkpoint_every`
+    epochs, and an interrupted run resumes from the latest checkpoint. `config`
+    (the run's hyperparameters) is stored with it, and a checkpoint written
+    under a different config is refused rather than silently resumed. The
+    checkpoint is removed once a run completes, so the next run starts fresh.
+    Returns the per-epoch history.
+    """
+    state = {"epoch": 0, "best_val": float("inf"), "best_epoch": 0, "bad_epochs": 0,
+             "best_model": None, "history": []}
+
+    latest = os.path.join(checkpoint_dir, "latest.pt") if checkpoint_dir else None
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        if resume and os.path.exists(latest):
+            ckpt = torch.load(latest, weights_only=False)
+            if ckpt.get("config") != config:
+                raise ValueError(
+                    f"{latest} was written by a run with config {ckpt.get('config')}, not {config}; "
+                    "rerun with the same settings to resume, or with --no_resume to start fresh"
+                )
+            model.load_state_dict(ckpt["model"])
+            optimizer.load_state_dict(ckpt["optimizer"])
+            _set_rng_state(ckpt["rng"])
+            state = ckpt["state"]
+            print(f"Resumed from {latest} at epoch {state['epoch']}")
+        elif not resume and os.path.exists(latest):
+            # A fresh run must not be resumed from an older run's checkpoint if it dies before its first save
+            os.remove(latest)
+
+    for epoch in range(state["epoch"], epochs):
+        if state["bad_epochs"] >= patience:
+            break
+
+        model.train()
+        train_loader = make_loader(epoch)
+        epoch_loss = 0.0
+        for batch in train_loader:
+            optimizer.zero_grad()
+            loss = train_loss(model, batch)
+            loss.backward()
+            optimizer.step()
+            epoch_loss += loss.item()
+        epoch_loss /= max(len(train_loader), 1)
+
+        val = evaluate_loss(model, val_loader, val_loss)
+        if val < state["best_val"] - min_delta:
+            state.update(best_val=val, best_epoch=epoch + 1, bad_epochs=0,
+                         best_model=copy.deepcopy(model.state_dict()))
+        else:
+            state["bad_epochs"] += 1
+        state["epoch"] = epoch + 1
+        state["history"].append({"epoch": epoch + 1, "loss": epoch_loss, "val_loss": val})
+        print(f"Epoch {epoch+1}/{epochs} | Loss: {epoch_loss:.5f} | Val Loss: {val:.5f}"
+              + (" *" if state["best_epoch"] == epoch + 1 else ""))
+
+        stopping = state["bad_epochs"] >= patience
+        if checkpoint_dir and ((epoch + 1) % checkpoint_every == 0 or stopping or epoch + 1 == epochs):
+            save_checkpoint(latest, {
+                "model": model.state_dict(),
+                "optimizer": optimizer.state_dict(),
+                "rng": _rng_state(),
+                "state": state,
+                "config": config,
+            })
+        if stopping:
+            print(f"Early stopping: no improvement for {patience} epochs (best epoch {state['best_epoch']})")
+
+    if latest and os.path.exists(latest):
+        # Finished: only interrupted runs should ever be resumed
+        os.remove(latest)
+
+    if state["best_model"] is not None:
+        model.load_state_dict(state["best_model"])
+    model.eval()
+    return state["history"]
@@ -1,4 +1,5 @@
 import os
+import time
 import pandas as pd
 import numpy as np
 import torch
@@ -7,12 +8,15 @@ from torch.utils.data import DataLoader, TensorDataset
 import matplotlib.pyplot as plt
 import seaborn as sns
 from src.models.autoencoder import FraudAutoencoder
+from src.data.sampling import NegativeSampler
+from src.trainers.loop import fit
 
 
-def prepare_unsupervised_data():
+def prepare_unsupervised_data(include_val=False):
     """
     Loads processed train/test datasets, drops labels,
     and converts every column to numeric float32 tensors.
+    With include_val=True also returns the validation split: (train, val, test).
     """
     import pandas as pd
     import numpy as np
@@ -46,39 +50,86 @@ def prepare_unsupervised_data():
     X_train = torch.tensor(X_train, dtype=torch.float32)
     X_test  = torch.tensor(X_test, dtype=torch.float32)
 
+    if include_val:
+        val = clean_df(pd.read_csv("data/processed/val.csv")).drop(columns=["isFraud"], errors="ignore")
+        X_val = torch.tensor(np.asarray(val.values, dtype=np.float32), dtype=torch.float32)
+        return X_train, X_val, X_test
+
     return X_train, X_test
 
 
-def train_autoencoder():
-    X_train, X_test = prepare_unsupervised_data()
+def reconstruction_errors(model, X):
+    model.eval()
+    with torch.no_grad():
+        return torch.mean((X - model(X)) ** 2, dim=1).numpy()
+
+
+def fit_autoencoder(X_train, X_val, neg_rate=None, epochs=25, patience=3, checkpoint_dir=None, resume=True):
+    """Train a FraudAutoencoder with the shared loop; returns (model, history)."""
     input_dim = X_train.shape[1]
 
     model = FraudAutoencoder(input_dim)
-    criterion = nn.MSELoss()
+    criterion = nn.MSELoss(reduction="none")
     optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
-    train_loader = DataLoader(TensorDataset(X_train), batch_size=512, shuffle=True)
 
-    epochs = 25
-    losses = []
+    # Labels are only used to subsample legitimate rows; the model itself never sees them
+    sampler = None
+    if neg_rate is not None:
+        y_train = pd.read_csv("data/processed/train.csv", usecols=["isFraud"])["isFraud"].values
+        sampler = NegativeSampler(y_train, neg_rate)
+    full_weights = torch.ones(len(X_train))
+
+    def make_loader(epoch):
+        if sampler is None:
+            return DataLoader(TensorDataset(X_train, full_weights), batch_size=512, shuffle=True)
+        idx, weights = sampler.epoch(epoch)
+        idx = torch.from_numpy(idx)
+        return DataLoader(TensorDataset(X_train[idx], torch.from_numpy(weights)), batch_size=512, shuffle=True)
+
+    def train_loss(model, batch):
+        xb, wb = batch
+        return (criterion(model(xb), xb).mean(dim=1) * wb).sum() / wb.sum()
 
-    model.train()
+    def val_loss(model, batch):
+        (xb,) = batch
+        return criterion(model(xb), xb).mean(dim=1).sum(), len(xb)
+
+    val_loader = DataLoader(TensorDataset(X_val), batch_size=8192)
+
+    history = fit(model, optimizer, train_loss, make_loader, val_loader, val_loss,
+                  epochs, patience=patience, checkpoint_dir=checkpoint_dir, resume=resume,
+                  config={"lr": 0.001, "neg_rate": neg_rate, "batch_size": 512, "epochs": epochs})
+    return model, history
+
+
+def train_autoencoder(neg_rate=None, epochs=25, patience=3,
+                      checkpoint_dir="artifacts/checkpoints/autoencoder", resume=True, compare_full=False):
+    X_train, X_val, X_test = prepare_unsupervised_data(include_val=True)
+
+    start = time.perf_counter()
     print("🚀 Training Autoencoder (unsupervised)...")
-    for epoch in range(epochs):
-        epoch_loss = 0
-        for (xb,) in train_loader:
-            optimizer.zero_grad()
-            reconstructed = model(xb)
-            loss = criterion(reconstructed, xb)
-            loss.backward()
-            optimizer.step()
-            epoch_loss += loss.item()
-        avg_loss = epoch_loss / len(train_loader)
-        losses.append(avg_loss)
-        print(f"Epoch {epoch+1}/{epochs} | Reconstruction Loss: {avg_loss:.6f}")
+    model, history = fit_autoencoder(X_train, X_val, neg_rate, epochs, patience, checkpoint_dir, resume)
+    fit_seconds = time.perf_counter() - start
+    losses = [h["loss"] for h in history]
+    print(f"Training wall-clock: {fit_seconds:.1f}s (neg_rate={neg_rate or 'all'})")
+
+    if compare_full and neg_rate is not None:
+        # Labels only score the comparison: PR-AUC of reconstruction error as the fraud score
+        from sklearn.metrics import average_precision_score
+        y_val = pd.read_csv("data/processed/val.csv", usecols=["isFraud"])["isFraud"].values
+        start = time.perf_counter()
+        full_model, _ = fit_autoencoder(X_train, X_val, None, epochs, patience)
+        full_seconds = time.perf_counter() - start
+        pr = average_precision_score(y_val, reconstruction_errors(model, X_val))
+        full_pr = average_precision_score(y_val, reconstruction_errors(full_model, X_val))
+        print("\n Downsampled vs full-data training (validation, reconstruction error as score):")
+        print(f"  Wall-clock:  {fit_seconds:.1f}s vs {full_seconds:.1f}s ({full_seconds / max(fit_seconds, 1e-9):.1f}x faster)")
+        print(f"  PR-AUC:      {pr:.4f} vs {full_pr:.4f} ({pr - full_pr:+.4f})")
 
     # Plot training loss
     plt.figure(figsize=(6, 4))
     plt.plot(losses, label="Training Loss")
+    plt.plot([h["val_loss"] for h in history], label="Validation Loss")
     plt.xlabel("Epoch")
     plt.ylabel("MSE Loss")
     plt.title("Autoencoder Training Loss Curve")
@@ -86,10 +137,7 @@ def train_autoencoder():
     plt.show()
 
     # Evaluation
-    model.eval()
-    with torch.no_grad():
-        reconstructed = model(X_test)
-        reconstruction_error = torch.mean((X_test - reconstructed) ** 2, dim=1).numpy()
+    reconstruction_error = reconstruction_errors(model, X_test)
 
     # Visualize reconstruction error distribution
     plt.figure(figsize=(6, 4))
@@ -147,4 +195,15 @@ def train_autoencoder():
 
 
 if __name__ == "__main__":
-    train_autoencoder()
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--neg_rate", type=float, default=None,
+                        help="fraction of legitimate rows sampled per epoch (default: all)")
+    parser.add_argument("--epochs", type=int, default=25)
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--no_resume", action="store_true", help="ignore existing checkpoints and start fresh")
+    parser.add_argument("--compare_full", action="store_true",
+                        help="also train on full data and report wall-clock / validation PR-AUC")
+    args = parser.parse_args()
+    train_autoencoder(args.neg_rate, args.epochs, args.patience, resume=not args.no_resume,
+                      compare_full=args.compare_full)
@@ -0,0 +1,106 @@
+import json
+import os
+import pandas as pd
+from sklearn.metrics import precision_score, recall_score, average_precision_score
+from src.models.classical import load_model
+from src.models.cascade import CascadeStage, CascadeScorer, sklearn_stage, torch_stage, calibrate_bands
+
+
+def build_stage(name):
+    """Load a trained model from artifacts/ and wrap it as a cascade stage."""
+    if name in ("log", "rf", "xgb"):
+        return CascadeStage(name, sklearn_stage(load_model(f"artifacts/{name}_model.joblib")))
+
+    import torch
+    if name == "mlp":
+        from src.models.dl_model import FraudDetectionMLP
+        with open("data/processed/feature_cols.json") as f:
+            input_dim = len(json.load(f)["all_columns"])
+        model = FraudDetectionMLP(input_dim)
+        model.load_state_dict(torch.load("artifacts/dl_model.pth"))
+        return CascadeStage(name, torch_stage(model))
+    if name == "quantum":
+        from src.models.quantum_model import QuantumClassifier
+        model = QuantumClassifier(n_qubits=3, n_features=3)
+        model.load_state_dict(torch.load("artifacts/quantum_model.pth"))
+        # train_quantum fits on the first 3 feature columns only
+        return CascadeStage(name, torch_stage(model, columns=slice(0, 3)))
+    raise ValueError(f"Unknown stage: {name}")
+
+
+def load_cascade(path="artifacts/cascade_config.json"):
+    """Rebuild a calibrated CascadeScorer from the config written by main()."""
+    with open(path) as f:
+        config = json.load(f)
+    stages = []
+    for s in config["stages"]:
+        stage = build_stage(s["name"])
+        stage.low = s["low"]
+        stage.high = float("inf") if s["high"] is None else s["high"]  # null = this stage never auto-flags
+        stage.cost = s["cost"]
+        stages.append(stage)
+    return CascadeScorer(stages, threshold=config.get("threshold", 0.5))
+
+
+def report(name, y, probs, stats=None):
+    preds = (probs >= 0.5).astype(int)
+    print(f"\n {name}:")
+    print(f"  Precision:  {precision_score(y, preds, zero_division=0):.4f}")
+    print(f"  Recall:     {recall_score(y, preds, zero_division=0):.4f}")
+    print(f"  PR-AUC:     {average_precision_score(y, probs):.4f}")
+    if stats is not None:
+        for s in stats["stages"]:
+            print(f"  {s['name']:>8}: {s['rows']:>8} rows | decided {s['decided']:>8} | "
+                  f"escalated {s['escalation_rate']:.2%} | {s['seconds_per_row'] * 1e6:.1f} µs/row")
+        print(f"  Escalated past first stage: {stats['escalated_fraction']:.2%}")
+        print(f"  Effective cost: {stats['seconds_per_row'] * 1e6:.1f} µs/row")
+
+
+def main(stage_names=("log", "xgb", "mlp"), max_recall_loss=0.01, min_precision=0.95):
+    print(f"\n Calibrating cascade: {' -> '.join(stage_names)}\n")
+
+    val = pd.read_csv("data/processed/val.csv")
+    test = pd.read_csv("data/processed/test.csv")
+    y_val, X_val = val['isFraud'].values, val.drop(columns=['isFraud'])
+    y_test, X_test = test['isFraud'].values, test.drop(columns=['isFraud'])
+
+    scorer = CascadeScorer([build_stage(n) for n in stage_names])
+    bands = calibrate_bands(scorer, X_val, y_val, max_recall_loss, min_precision)
+    for b in bands:
+        print(f"  {b['name']:>8}: band [{b['low']:.4f}, {b['high']:.4f})")
+
+    cascade_probs, stats = scorer.score(X_test)
+    report("Cascade (test)", y_test, cascade_probs, stats)
+
+    # Reference: every row through the heaviest stage
+    final = scorer.stages[-1]
+    final_probs, final_stats = CascadeScorer([final]).score(X_test)
+    report(f"{final.name.upper()} only (test)", y_test, final_probs, final_stats)
+    print(f"\n  Speed-up vs {final.name} only: {final_stats['seconds_per_row'] / max(stats['seconds_per_row'], 1e-12):.1f}x")
+
+    os.makedirs("artifacts", exist_ok=True)
+    with open("artifacts/cascade_config.json", "w") as f:
+        json.dump({
+            # JSON has no infinity: a stage that never auto-flags is stored with high = null
+            "stages": [{**b, "high": None if b["high"] == float("inf") else b["high"]} for b in bands],
+            "threshold": scorer.threshold,
+            "max_recall_loss": max_recall_loss,
+            "min_precision": min_precision,
+            "test": {
+                "escalated_fraction": stats["escalated_fraction"],
+                "seconds_per_row": stats["seconds_per_row"],
+                "recall": recall_score(y_test, (cascade_probs >= 0.5).astype(int), zero_division=0),
+            },
+        }, f, indent=2, allow_nan=False)
+    print(" Cascade bands saved → artifacts/cascade_config.json")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stages", default="log,xgb,mlp",
+                        help="comma-separated, cheapest first: log, rf, xgb, mlp, quantum")
+    parser.add_argument("--max_recall_loss", type=float, default=0.01)
+    parser.add_argument("--min_precision", type=float, default=0.95)
+    args = parser.parse_args()
+    main(tuple(args.stages.split(",")), args.max_recall_loss, args.min_precision)
@@ -1,4 +1,5 @@
 import os
+import time
 import pandas as pd
 import numpy as np
 import torch
@@ -11,6 +12,9 @@ from sklearn.metrics import (
 import matplotlib.pyplot as plt
 import seaborn as sns
 from src.models.dl_model import FraudDetectionMLP
+from src.data.sampling import NegativeSampler
+from src.trainers.loop import fit
+from src.trainers.tune import load_params
 
 
 def prepare_data():
@@ -98,33 +102,78 @@ def plot_metrics(y_true, y_pred_probs, model_name):
     plt.show()
 
 
-def train_dl():
-    X_train, y_train, X_val, y_val, X_test, y_test = prepare_data()
+def fit_dl(X_train, y_train, X_val, y_val, neg_rate=None, lr=0.001, epochs=20, batch_size=512, patience=3,
+           checkpoint_dir=None, resume=True, random_state=None):
+    """
+    Train a FraudDetectionMLP with the shared loop (early stopping on X_val).
+    Tensors as returned by prepare_data: X float32 [n, d], y float32 [n, 1].
+    Also used by tune.py and cross_validate.py so all three train the same way.
+    """
+    if random_state is not None:
+        torch.manual_seed(random_state)
     input_dim = X_train.shape[1]
 
     model = FraudDetectionMLP(input_dim)
-    criterion = nn.BCELoss()
-    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
-
-    train_loader = DataLoader(TensorDataset(X_train, y_train), batch_size=512, shuffle=True)
-
-    epochs = 20
-    model.train()
-    for epoch in range(epochs):
-        epoch_loss = 0.0
-        for xb, yb in train_loader:
-            optimizer.zero_grad()
-            preds = model(xb)
-            loss = criterion(preds, yb)
-            loss.backward()
-            optimizer.step()
-            epoch_loss += loss.item()
-        print(f"Epoch {epoch+1}/{epochs} | Loss: {epoch_loss/len(train_loader):.5f}")
+    criterion = nn.BCELoss(reduction="none")
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+
+    # Full data: every row weighted 1. Downsampled: fresh negatives each epoch, importance-weighted.
+    sampler = NegativeSampler(y_train.numpy(), neg_rate) if neg_rate is not None else None
+    full_weights = torch.ones(len(y_train), 1)
+
+    def make_loader(epoch):
+        if sampler is None:
+            return DataLoader(TensorDataset(X_train, y_train, full_weights), batch_size=batch_size, shuffle=True)
+        idx, weights = sampler.epoch(epoch)
+        idx = torch.from_numpy(idx)
+        return DataLoader(
+            TensorDataset(X_train[idx], y_train[idx], torch.from_numpy(weights).unsqueeze(1)),
+            batch_size=batch_size, shuffle=True
+        )
+
+    def train_loss(model, batch):
+        xb, yb, wb = batch
+        return (criterion(model(xb), yb) * wb).sum() / wb.sum()
+
+    def val_loss(model, batch):
+        xb, yb = batch
+        return criterion(model(xb), yb).sum(), len(xb)
+
+    val_loader = DataLoader(TensorDataset(X_val, y_val), batch_size=8192)
+
+    fit(model, optimizer, train_loss, make_loader, val_loader, val_loss,
+        epochs, patience=patience, checkpoint_dir=checkpoint_dir, resume=resume,
+        config={"lr": lr, "neg_rate": neg_rate, "batch_size": batch_size, "epochs": epochs})
+    return model
+
+
+def val_pr_auc(model, X_val, y_val):
+    with torch.no_grad():
+        return average_precision_score(y_val.numpy().ravel(), model(X_val).numpy().flatten())
+
+
+def train_dl(neg_rate=None, lr=0.001, epochs=20, batch_size=512, patience=3,
+             checkpoint_dir="artifacts/checkpoints/dl", resume=True, compare_full=False):
+    X_train, y_train, X_val, y_val, X_test, y_test = prepare_data()
+
+    start = time.perf_counter()
+    model = fit_dl(X_train, y_train, X_val, y_val, neg_rate, lr, epochs, batch_size, patience,
+                   checkpoint_dir=checkpoint_dir, resume=resume)
+    fit_seconds = time.perf_counter() - start
+    print(f"Training wall-clock: {fit_seconds:.1f}s (neg_rate={neg_rate or 'all'})")
+
+    if compare_full and neg_rate is not None:
+        # No checkpoint for the reference run: it must not resume from (or overwrite) the downsampled one
+        start = time.perf_counter()
+        full_model = fit_dl(X_train, y_train, X_val, y_val, None, lr, epochs, batch_size, patience)
+        full_seconds = time.perf_counter() - start
+        pr, full_pr = val_pr_auc(model, X_val, y_val), val_pr_auc(full_model, X_val, y_val)
+        print("\n Downsampled vs full-data training (validation):")
+        print(f"  Wall-clock:  {fit_seconds:.1f}s vs {full_seconds:.1f}s ({full_seconds / max(fit_seconds, 1e-9):.1f}x faster)")
+        print(f"  PR-AUC:      {pr:.4f} vs {full_pr:.4f} ({pr - full_pr:+.4f})")
 
     # Evaluation
-    model.eval()
     with torch.no_grad():
-        y_val_pred = model(X_val).numpy().flatten()
         y_test_pred = model(X_test).numpy().flatten()
 
     acc, prec, rec, f1, roc, pr, cm = evaluate_dl(y_test.numpy(), y_test_pred)
@@ -145,4 +194,22 @@ def train_dl():
 
 
 if __name__ == "__main__":
-    train_dl()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--neg_rate", type=float, default=None,
+                        help="fraction of legitimate rows sampled per epoch (default: all)")
+    parser.add_argument("--lr", type=float, default=0.001)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch_size", type=int, default=512)
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--no_resume", action="store_true", help="ignore existing checkpoints and start fresh")
+    parser.add_argument("--compare_full", action="store_true",
+                        help="also train on full data and report wall-clock / PR-AUC")
+    parser.add_argument("--params", default=None,
+                        help="best.json from tune.py; its values override the matching flags")
+    args = parser.parse_args()
+    params = {"neg_rate": args.neg_rate, "lr": args.lr, "epochs": args.epochs, "batch_size": args.batch_size}
+    if args.params:
+        params.update(load_params(args.params, "mlp"))
+        print(f"Using tuned parameters from {args.params}: {params}")
+    train_dl(**params, patience=args.patience, resume=not args.no_resume, compare_full=args.compare_full)
\ No newline at end of file
@@ -2,16 +2,20 @@ import os
 import torch
 import torch.nn as nn
 from torch.utils.data import DataLoader, TensorDataset
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 import pandas as pd
 import numpy as np
 from src.models.quantum_model import QuantumClassifier
+from src.trainers.loop import fit
 
 
-def prepare_data(sample_size=500):
+def prepare_data(sample_size=500, include_val=False):
     """
     Load a small sample from the dataset for Quantum model training.
     Cleans all non-numeric columns and converts to float32 tensors.
+    With include_val=True also returns a stratified sample of `sample_size`
+    validation rows: (X_train, y_train, X_val, y_val, X_test, y_test).
     """
 
     import pandas as pd
@@ -52,32 +56,46 @@ def prepare_data(sample_size=500):
     X_test  = torch.tensor(np.asarray(X_test, dtype=np.float32))
     y_test  = torch.tensor(y_test, dtype=torch.float32).unsqueeze(1)
 
+    if include_val:
+        # Every validation row is a separate circuit run, so keep the split small, but stratified:
+        # at ~0.1% fraud the first few hundred rows usually contain no frauds at all
+        df_val = clean_df(pd.read_csv("data/processed/val.csv")).select_dtypes(include=[np.number])
+        if sample_size is not None and sample_size < len(df_val):
+            df_val, _ = train_test_split(df_val, train_size=sample_size, stratify=df_val["isFraud"], random_state=42)
+        y_val, X_val = df_val["isFraud"].values, df_val.drop(columns=["isFraud"]).values[:, :3]
+        X_val = torch.tensor(np.asarray(X_val, dtype=np.float32))
+        y_val = torch.tensor(y_val, dtype=torch.float32).unsqueeze(1)
+        return X_train, y_train, X_val, y_val, X_test, y_test
+
     return X_train, y_train, X_test, y_test
 
 
 
-def train_quantum():
-    X_train, y_train, X_test, y_test = prepare_data()
+def train_quantum(epochs=10, patience=3, checkpoint_dir="artifacts/checkpoints/quantum", resume=True):
+    X_train, y_train, X_val, y_val, X_test, y_test = prepare_data(include_val=True)
 
     model = QuantumClassifier(n_qubits=3, n_features=3)
     criterion = nn.BCELoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
 
-    train_loader = DataLoader(TensorDataset(X_train, y_train), batch_size=16, shuffle=True)
-    epochs = 10
+    def make_loader(epoch):
+        return DataLoader(TensorDataset(X_train, y_train), batch_size=16, shuffle=True)
+
+    def train_loss(model, batch):
+        xb, yb = batch
+        return criterion(model(xb), yb)
+
+    def val_loss(model, batch):
+        xb, yb = batch
+        return criterion(model(xb), yb) * len(xb), len(xb)
+
+    val_loader = DataLoader(TensorDataset(X_val, y_val), batch_size=64)
 
     print(" Training Quantum Hybrid Model...")
-    for epoch in range(epochs):
-        model.train()
-        epoch_loss = 0.0
-        for xb, yb in train_loader:
-            optimizer.zero_grad()
-            preds = model(xb)
-            loss = criterion(preds, yb)
-            loss.backward()
-            optimizer.step()
-            epoch_loss += loss.item()
-        print(f"Epoch {epoch+1}/{epochs} | Loss: {epoch_loss / len(train_loader):.5f}")
+    # Checkpoint every epoch: quantum epochs are the most expensive to lose
+    fit(model, optimizer, train_loss, make_loader, val_loader, val_loss,
+        epochs, patience=patience, checkpoint_dir=checkpoint_dir, resume=resume,
+        config={"lr": 0.01, "batch_size": 16, "epochs": epochs})
 
     # Evaluate
     model.eval()
@@ -105,4 +123,10 @@ def train_quantum():
 
 
 if __name__ == "__main__":
-    train_quantum()
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--no_resume", action="store_true", help="ignore existing checkpoints and start fresh")
+    args = parser.parse_args()
+    train_quantum(args.epochs, args.patience, resume=not args.no_resume)
@@ -0,0 +1,68 @@
+import os
+import time
+import joblib
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from src.models.quantum_kernel import QuantumKernelSVM
+from src.trainers.train_quantum import prepare_data
+
+
+def stratified_subsample(X, y, n, random_state=42):
+    """Keep the kernel tractable: the Gram matrix is O(n^2) in the number of training rows."""
+    if n is None or n >= len(y):
+        return X, y
+    X_sub, _, y_sub, _ = train_test_split(X, y, train_size=n, stratify=y, random_state=random_state)
+    return X_sub, y_sub
+
+
+def train_quantum_kernel(train_size=2000, test_size=5000, tile_size=512, n_workers=None,
+                         cache_dir="artifacts/kernel_cache"):
+    X_train, y_train, X_test, y_test = prepare_data()
+    X_train, y_train = X_train.numpy(), y_train.numpy().ravel()
+    X_test, y_test = X_test.numpy(), y_test.numpy().ravel()
+
+    X_train, y_train = stratified_subsample(X_train, y_train, train_size)
+    X_test, y_test = stratified_subsample(X_test, y_test, test_size)
+
+    model = QuantumKernelSVM(n_qubits=3, n_features=3, tile_size=tile_size,
+                             n_workers=n_workers, cache_dir=cache_dir)
+
+    print(f" Training Quantum Kernel SVM on {len(y_train)} samples...")
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    print(f" Train Gram matrix + SVM fit: {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    y_pred_probs = model.predict_proba(X_test)[:, 1]
+    print(f" Test-vs-train kernel + scoring: {time.perf_counter() - start:.1f}s")
+    y_pred = (y_pred_probs >= 0.5).astype(int)
+
+    acc = accuracy_score(y_test, y_pred)
+    prec = precision_score(y_test, y_pred, zero_division=0)
+    rec = recall_score(y_test, y_pred, zero_division=0)
+    f1 = f1_score(y_test, y_pred, zero_division=0)
+    roc = roc_auc_score(y_test, y_pred_probs)
+
+    print("\n Quantum Kernel SVM Results:")
+    print(f"Accuracy:   {acc:.4f}")
+    print(f"Precision:  {prec:.4f}")
+    print(f"Recall:     {rec:.4f}")
+    print(f"F1-score:   {f1:.4f}")
+    print(f"ROC-AUC:    {roc:.4f}")
+
+    os.makedirs("artifacts", exist_ok=True)
+    joblib.dump(model, "artifacts/quantum_kernel_svm.joblib")
+    print(" Saved Quantum Kernel SVM → artifacts/quantum_kernel_svm.joblib")
+    print(f" Kernel tiles cached in {cache_dir}/")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--train_size", type=int, default=2000)
+    parser.add_argument("--test_size", type=int, default=5000)
+    parser.add_argument("--tile_size", type=int, default=512)
+    parser.add_argument("--n_workers", type=int, default=None)
+    parser.add_argument("--cache_dir", default="artifacts/kernel_cache")
+    args = parser.parse_args()
+    train_quantum_kernel(args.train_size, args.test_size, args.tile_size, args.n_workers, args.cache_dir)
@@ -0,0 +1,228 @@
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, roc_auc_score
+from src.models.classical import build_logistic, build_rf, build_xgb
+
+# Each space maps a hyperparameter to a sampler; the budget parameter is what
+# successive halving grows between rungs (boosting rounds, trees, iterations, epochs).
+# Only parameters the trainers accept are searched, so best.json can be passed
+# straight to train_classical.py / train_dl.py with --params.
+SEARCH_SPACES = {
+    "log": {
+        "budget": "max_iter", "min_budget": 50, "max_budget": 1000,
+        "params": {
+            "C": lambda rng: float(10 ** rng.uniform(-3, 2)),
+        },
+    },
+    "rf": {
+        "budget": "n_estimators", "min_budget": 25, "max_budget": 400,
+        "params": {
+            "max_depth": lambda rng: int(rng.choice([6, 10, 16, 24, 0])) or None,
+            "min_samples_leaf": lambda rng: int(rng.choice([1, 2, 5, 10])),
+            "max_features": lambda rng: str(rng.choice(["sqrt", "log2"])),
+        },
+    },
+    "xgb": {
+        "budget": "n_estimators", "min_budget": 25, "max_budget": 600,
+        "params": {
+            "max_depth": lambda rng: int(rng.integers(3, 11)),
+            "learning_rate": lambda rng: float(10 ** rng.uniform(-2.3, -0.5)),
+            "subsample": lambda rng: float(rng.uniform(0.5, 1.0)),
+            "colsample_bytree": lambda rng: float(rng.uniform(0.5, 1.0)),
+            "min_child_weight": lambda rng: float(10 ** rng.uniform(0, 1.5)),
+            "reg_lambda": lambda rng: float(10 ** rng.uniform(-1, 1)),
+        },
+    },
+    "mlp": {
+        "budget": "epochs", "min_budget": 2, "max_budget": 30,
+        "params": {
+            "lr": lambda rng: float(10 ** rng.uniform(-4, -2)),
+            "batch_size": lambda rng: int(rng.choice([256, 512, 1024, 2048])),
+            "neg_rate": lambda rng: [None, 0.05, 0.2][int(rng.integers(3))],
+        },
+    },
+}
+
+# Filled once per worker process: the data is loaded in the parent and inherited on fork
+_DATA = {}
+
+
+def load_data():
+    train = pd.read_csv("data/processed/train.csv")
+    val = pd.read_csv("data/processed/val.csv")
+    return {
+        "X_train": train.drop(columns=['isFraud']).to_numpy(dtype=np.float32),
+        "y_train": train['isFraud'].to_numpy(),
+        "X_val": val.drop(columns=['isFraud']).to_numpy(dtype=np.float32),
+        "y_val": val['isFraud'].to_numpy(),
+    }
+
+
+def _init_worker(data):
+    _DATA.update(data)
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def run_trial(model_type, params, budget):
+    """Train one configuration at one budget and score it on the validation split."""
+    X_train, y_train = _DATA["X_train"], _DATA["y_train"]
+    X_val, y_val = _DATA["X_val"], _DATA["y_val"]
+    budget_param = SEARCH_SPACES[model_type]["budget"]
+
+    start = time.perf_counter()
+    if model_type == "mlp":
+        import torch
+        from src.trainers.train_dl import fit_dl
+
+        X_val_t = torch.from_numpy(X_val)
+        model = fit_dl(torch.from_numpy(X_train), torch.tensor(y_train, dtype=torch.float32).unsqueeze(1),
+                       X_val_t, torch.tensor(y_val, dtype=torch.float32).unsqueeze(1),
+                       epochs=budget, random_state=42, **params)
+        with torch.no_grad():
+            probs = model(X_val_t).numpy().flatten()
+    else:
+        builder = {"log": build_logistic, "rf": build_rf, "xgb": build_xgb}[model_type]
+        extra = {} if model_type == "log" else {"n_jobs": 1}  # parallelism comes from the trial pool
+        model = builder(**params, **extra, **{budget_param: budget})
+        model.fit(X_train, y_train)
+        probs = model.predict_proba(X_val)[:, 1]
+
+    return {
+        "pr_auc": float(average_precision_score(y_val, probs)),
+        "roc_auc": float(roc_auc_score(y_val, probs)),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def load_params(path, model_type):
+    """Hyperparameters from a best.json written by hyperband(), checked against the model they were tuned for."""
+    with open(path) as f:
+        best = json.load(f)
+    if best.get("model_type", model_type) != model_type:
+        raise ValueError(f"{path} holds parameters for {best['model_type']!r}, not {model_type!r}")
+    return best["params"]
+
+
+class TrialLog:
+    """Append-only JSONL of finished trials; lets an interrupted search resume where it stopped."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.results = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        rec = json.loads(line)
+                        self.results[(rec["trial_id"], rec["budget"])] = rec
+
+    def get(self, trial_id, budget):
+        return self.results.get((trial_id, budget))
+
+    def add(self, rec):
+        self.results[(rec["trial_id"], rec["budget"])] = rec
+        with open(self.path, "a") as f:
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def sample_configs(model_type, n, rng):
+    space = SEARCH_SPACES[model_type]["params"]
+    return [{name: sampler(rng) for name, sampler in space.items()} for _ in range(n)]
+
+
+def successive_halving(pool, model_type, configs, min_budget, max_budget, eta, log, bracket):
+    """
+    Evaluate all configs at `min_budget`, keep the best 1/eta, multiply the
+    budget by eta, repeat until one rung reaches `max_budget`.
+    """
+    survivors = list(configs.items())
+    budget = min_budget
+    rung = 0
+    while survivors:
+        budget = min(int(round(budget)), max_budget)
+        scored = []
+        pending = {}
+        for trial_id, params in survivors:
+            done = log.get(trial_id, budget)
+            if done is not None and done["params"] == params:
+                scored.append((done["pr_auc"], trial_id, params))
+            else:
+                pending[pool.submit(run_trial, model_type, params, budget)] = (trial_id, params)
+
+        for fut in as_completed(pending):
+            trial_id, params = pending[fut]
+            metrics = fut.result()
+            log.add({"trial_id": trial_id, "bracket": bracket, "rung": rung, "budget": budget,
+                     "params": params, **metrics})
+            scored.append((metrics["pr_auc"], trial_id, params))
+
+        scored.sort(key=lambda r: r[0], reverse=True)
+        best = scored[0]
+        print(f"  bracket {bracket} rung {rung}: {len(scored)} trials @ {budget} | "
+              f"best PR-AUC {best[0]:.4f} ({best[1]})")
+        if budget >= max_budget or len(scored) == 1:
+            return best
+        survivors = [(tid, p) for _, tid, p in scored[:max(1, len(scored) // eta)]]
+        budget *= eta
+        rung += 1
+
+
+def hyperband(model_type="xgb", eta=3, n_workers=None, seed=42, out_dir="results/tuning"):
+    """
+    Hyperband: several successive-halving brackets trading off many configs at
+    a small budget against few configs at a large one. Configs are drawn from
+    a seeded RNG, so re-running with the same seed resumes from the trial log.
+    """
+    space = SEARCH_SPACES[model_type]
+    min_budget, max_budget = space["min_budget"], space["max_budget"]
+    s_max = int(math.floor(math.log(max_budget / min_budget, eta)))
+    rng = np.random.default_rng(seed)
+    log = TrialLog(os.path.join(out_dir, model_type, "trials.jsonl"))
+    print(f"\n Hyperband search for {model_type.upper()} ({len(log.results)} trials already logged)\n")
+
+    data = load_data()
+    ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+    best = None
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(data,)) as pool:
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            configs = {f"b{s}-t{i}": p for i, p in enumerate(sample_configs(model_type, n, rng))}
+            result = successive_halving(pool, model_type, configs, max_budget / eta ** s, max_budget, eta, log, s)
+            if best is None or result[0] > best[0]:
+                best = result
+
+    pr_auc, trial_id, params = best
+    params = {**params, space["budget"]: max_budget}
+    with open(os.path.join(out_dir, model_type, "best.json"), "w") as f:
+        json.dump({"model_type": model_type, "trial_id": trial_id, "pr_auc": pr_auc, "params": params}, f, indent=2)
+    print(f"\n Best {model_type.upper()}: PR-AUC {pr_auc:.4f} with {params}")
+    print(f" Trials logged in {log.path}")
+    trainer = "train_dl" if model_type == "mlp" else f"train_classical --model_type {model_type}"
+    print(f" Train with: python -m src.trainers.{trainer} --params {os.path.join(out_dir, model_type, 'best.json')}")
+    return params
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_type", default="xgb", choices=list(SEARCH_SPACES))
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--n_workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out_dir", default="results/tuning")
+    args = parser.parse_args()
+    hyperband(args.model_type, args.eta, args.n_workers, args.seed, args.out_dir)
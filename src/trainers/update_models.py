@@ -0,0 +1,201 @@
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+import joblib
+import numpy as np
+from sklearn.metrics import average_precision_score
+from src.data.preprocessing import load_raw, feature_engineer
+from src.models.classical import build_xgb, load_model, save_model
+
+VERSIONS_DIR = "artifacts/versions"
+
+# Where the artifacts live before the first incremental update
+INITIAL_ARTIFACTS = {
+    "xgb": "artifacts/xgb_model.joblib",
+    "mlp": "artifacts/dl_model.pth",
+    "ae": "artifacts/autoencoder.pth",
+    "scaler": "data/processed/scaler.pkl",
+    "features": "data/processed/feature_cols.json",
+}
+
+ARTIFACT_FILES = {
+    "xgb": "xgb_model.joblib",
+    "mlp": "dl_model.pth",
+    "ae": "autoencoder.pth",
+    "scaler": "scaler.pkl",
+    "features": "feature_cols.json",
+}
+
+
+def latest_version():
+    if not os.path.isdir(VERSIONS_DIR):
+        return None
+    # In-progress updates live in dot-prefixed temp dirs and are never a base
+    versions = sorted(d for d in os.listdir(VERSIONS_DIR)
+                      if not d.startswith(".") and os.path.isdir(os.path.join(VERSIONS_DIR, d)))
+    return versions[-1] if versions else None
+
+
+def artifact_paths(version, root=None):
+    if version is None:
+        return dict(INITIAL_ARTIFACTS)
+    root = root or os.path.join(VERSIONS_DIR, version)
+    return {k: os.path.join(root, f) for k, f in ARTIFACT_FILES.items()}
+
+
+def prepare_batch(path, scaler, meta):
+    """
+    Feature-engineer a raw labelled batch and scale it with the parent version's
+    scaler. The models being updated learned their weights and split thresholds
+    in that scaled space, so incremental updates must not refit it; a refitted
+    scaler only ships with a full retrain.
+    """
+    df = feature_engineer(load_raw(path))
+    y = df['isFraud'].values
+    X = df.reindex(columns=meta['all_columns'], fill_value=0)
+    numeric_cols = meta['numeric_cols']
+
+    X = X.astype(np.float32)
+    X[numeric_cols] = scaler.transform(X[numeric_cols])
+    return X, y
+
+
+def update_xgb(old_model, X, y, n_rounds):
+    """Continue boosting: the new model starts from the old booster and adds `n_rounds` trees."""
+    model = build_xgb()
+    model.set_params(n_estimators=n_rounds)
+    model.fit(X, y, xgb_model=old_model.get_booster())
+    return model
+
+
+def fine_tune_torch(model, X, y=None, epochs=3, lr=1e-4, batch_size=512):
+    """Fine-tune a saved torch model on the new batch (supervised if y is given, reconstruction otherwise)."""
+    import torch
+    import torch.nn as nn
+    from torch.utils.data import DataLoader, TensorDataset
+
+    X_t = torch.tensor(np.asarray(X, dtype=np.float32))
+    if y is not None:
+        dataset = TensorDataset(X_t, torch.tensor(y, dtype=torch.float32).unsqueeze(1))
+        criterion = nn.BCELoss()
+    else:
+        dataset = TensorDataset(X_t, X_t)
+        criterion = nn.MSELoss()
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True)
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+
+    model.train()
+    for epoch in range(epochs):
+        epoch_loss = 0.0
+        for xb, target in loader:
+            optimizer.zero_grad()
+            loss = criterion(model(xb), target)
+            loss.backward()
+            optimizer.step()
+            epoch_loss += loss.item()
+        print(f"  Epoch {epoch+1}/{epochs} | Loss: {epoch_loss/len(loader):.5f}")
+    model.eval()
+    return model
+
+
+def update_models(batch_path, models=("xgb", "mlp", "ae"), base_version=None,
+                  xgb_rounds=20, epochs=3, lr=1e-4, holdout=0.2):
+    base_version = base_version or latest_version()
+    base = artifact_paths(base_version)
+    version = datetime.now().strftime("%Y%m%d-%H%M%S")
+    out_dir = os.path.join(VERSIONS_DIR, version)
+    # Build the version in a temp dir and rename it into place only when complete,
+    # so a crash never leaves a partial version for latest_version() to pick up
+    tmp_dir = os.path.join(VERSIONS_DIR, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    try:
+        _write_update(batch_path, models, base_version, base, version, tmp_dir, xgb_rounds, epochs, lr, holdout)
+        os.replace(tmp_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    out = artifact_paths(version)
+    print(f"\n New artifact version saved in {out_dir}/ (previous versions untouched)")
+    print(f" Hot-swap with: POST /admin/reload "
+          f'{{"model_path": "{out["xgb"]}", "scaler_path": "{out["scaler"]}", "feature_path": "{out["features"]}"}}')
+    return version
+
+
+def _write_update(batch_path, models, base_version, base, version, out_dir, xgb_rounds, epochs, lr, holdout):
+    out = artifact_paths(version, root=out_dir)
+    print(f"\n Updating {base_version or 'initial artifacts'} → {version} with {batch_path}\n")
+
+    with open(base["features"]) as f:
+        meta = json.load(f)
+    X, y = prepare_batch(batch_path, joblib.load(base["scaler"]), meta)
+    shutil.copy(base["scaler"], out["scaler"])
+    shutil.copy(base["features"], out["features"])
+    print(f" Batch: {len(y)} rows, {int(y.sum())} frauds; scaled with the parent version's scaler")
+
+    # Hold back the tail of the batch to check the update didn't hurt
+    n_fit = len(y) - int(len(y) * holdout)
+    X_fit, y_fit, X_hold, y_hold = X.iloc[:n_fit], y[:n_fit], X.iloc[n_fit:], y[n_fit:]
+    timings = {}
+
+    if "xgb" in models:
+        start = time.perf_counter()
+        old = load_model(base["xgb"])
+        new = update_xgb(old, X_fit, y_fit, xgb_rounds)
+        timings["xgb"] = time.perf_counter() - start
+        save_model(new, out["xgb"])
+        print(f" XGBoost: +{xgb_rounds} rounds in {timings['xgb']:.1f}s")
+        if len(y_hold) and 0 < y_hold.sum() < len(y_hold):
+            print(f"  Holdout PR-AUC: {average_precision_score(y_hold, old.predict_proba(X_hold)[:, 1]):.4f} → "
+                  f"{average_precision_score(y_hold, new.predict_proba(X_hold)[:, 1]):.4f}")
+    else:
+        shutil.copy(base["xgb"], out["xgb"])
+
+    if "mlp" in models or "ae" in models:
+        import torch
+
+    if "mlp" in models:
+        from src.models.dl_model import FraudDetectionMLP
+        start = time.perf_counter()
+        model = FraudDetectionMLP(X.shape[1])
+        model.load_state_dict(torch.load(base["mlp"]))
+        print(" Fine-tuning MLP...")
+        fine_tune_torch(model, X_fit, y_fit, epochs, lr)
+        timings["mlp"] = time.perf_counter() - start
+        torch.save(model.state_dict(), out["mlp"])
+    else:
+        shutil.copy(base["mlp"], out["mlp"])
+
+    if "ae" in models:
+        from src.models.autoencoder import FraudAutoencoder
+        start = time.perf_counter()
+        model = FraudAutoencoder(X.shape[1])
+        model.load_state_dict(torch.load(base["ae"]))
+        print(" Fine-tuning Autoencoder...")
+        fine_tune_torch(model, X_fit, None, epochs, lr)
+        timings["ae"] = time.perf_counter() - start
+        torch.save(model.state_dict(), out["ae"])
+    else:
+        shutil.copy(base["ae"], out["ae"])
+
+    with open(os.path.join(out_dir, "update_meta.json"), "w") as f:
+        json.dump({
+            "version": version, "parent": base_version, "batch": os.path.abspath(batch_path),
+            "rows": int(len(y)), "frauds": int(y.sum()), "updated": list(models), "seconds": timings,
+        }, f, indent=2)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", required=True, help="raw labelled transactions CSV (same schema as the original dataset)")
+    parser.add_argument("--models", default="xgb,mlp,ae")
+    parser.add_argument("--base_version", default=None, help="version under artifacts/versions to update (default: latest)")
+    parser.add_argument("--xgb_rounds", type=int, default=20)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--lr", type=float, default=1e-4)
+    args = parser.parse_args()
+    update_models(args.input, tuple(args.models.split(",")), args.base_version,
+                  args.xgb_rounds, args.epochs, args.lr)